@@ -1,12 +1,238 @@
+# Bibliotecas pesadas (plotly, matplotlib/smtplib do relatório) e as
+# planilhas só são carregadas quando a parte da página que as usa roda, para
+# o título e a barra lateral aparecerem logo. Para medir o custo dos imports:
+#   python -X importtime -c "import Hello" 2> importtime.log
+#   sort -t'|' -k2 -n importtime.log | tail -20
 import streamlit as st
 import pandas as pd
-from database import fechamento, conectData
-from relatorios import enviar_relatorio_email
+from servico import ativar_copy_on_write, obter_dados, servico_dados, filtrar_periodo
+from componentes import abas_preguicosas
+from metricas import calcular_metricas, contagem, por_colaborador
+from graficos import grafico
+
+from tarefas import fila_tarefas, CONCLUIDA, EXECUTANDO, FALHOU, INTERROMPIDA, NA_FILA
+
+# Visões rasas dos frames compartilhados (ver servico.py)
+ativar_copy_on_write()
+
+def filtrar_fechamento(df, df_cte, data_inicial, data_final, colaborador, tipo_operacao):
+    df_filtrado = filtrar_periodo(df, data_inicial, data_final, ordenado=True)
+    df_filtrado_cte = filtrar_periodo(df_cte, data_inicial, data_final, ordenado=True)
+
+    if colaborador != "Todos":
+        df_filtrado = df_filtrado[df_filtrado["Colaborador"] == colaborador]
+
+    if tipo_operacao != "Todos":
+        df_filtrado = df_filtrado[df_filtrado["Tipo"] == tipo_operacao]
+
+    return df_filtrado, df_filtrado_cte
+
+def metricas_fechamento(df, df_cte, *filtros):
+    df_filtrado, _ = servico_dados().memo(["fechamento", "cte"], filtrar_fechamento, *filtros)
+    return calcular_metricas(df_filtrado)
+
+# ==================== Figuras das abas ====================
+# Cada aba monta a sua figura a partir das métricas (e do frame filtrado,
+# quando precisa do detalhe por dia). Só a aba aberta é calculada (ver
+# componentes.abas_preguicosas) e o resultado fica no memo.
+def fig_operacoes(df_filtrado, metricas):
+    tipo_sum = metricas["operacoes_por_tipo"].reset_index()
+    tipo_sum.columns = ["Tipo de Operação", "Quantidade"]
+    fig = grafico(
+        "bar",
+        tipo_sum,
+        x="Tipo de Operação",
+        y="Quantidade",
+        text_auto=True,
+        title="📊 Quantidade de Operações por Tipo",
+        color="Tipo de Operação",
+    )
+    return fig
+
+def fig_destinos(df_filtrado, metricas):
+    # Top 10 destinos dos lançamentos
+    dest_sum = metricas["top_destinos"].reset_index()
+    dest_sum.columns = ["Destino", "Quantidade"]
+
+    # Cria o gráfico com as personalizações visuais
+    fig = grafico(
+        "bar",
+        dest_sum,
+        x="Destino",
+        y="Quantidade",
+        text_auto=True,
+        color="Destino",
+        title="🏁 Destinos com Mais Lançamentos de Viagem",
+        layout=dict(
+            xaxis_title="Destino",
+            yaxis_title="Quantidade de Lançamentos",
+            title_x=0,
+            showlegend=True,
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+        ),
+        traces=dict(textposition="outside"),
+    )
+    return fig
+
+def fig_baixas(df_filtrado, metricas):
+    if contagem(metricas, "baixa") == 0:
+        return None
+
+    cte_por_colab = por_colaborador(metricas, "baixa", "cte").reset_index(name="QTD de CT-e")
+
+    fig = grafico(
+        "pie",
+        cte_por_colab,
+        names="Colaborador",
+        values="QTD de CT-e",
+        title="📦 Percentual de CT-e Baixados por Colaborador",
+        traces=dict(
+            textinfo="percent+label+value",
+            pull=[0.05 if i == cte_por_colab["QTD de CT-e"].idxmax() else 0 for i in range(len(cte_por_colab))]
+        ),
+        layout=dict(title_x=0, showlegend=True),
+    )
+    return fig
+
+def fig_abastecimentos(df_filtrado, metricas):
+    if contagem(metricas, "abastecimento") == 0:
+        return None
+
+    # Quantas placas (ou abastecimentos) cada colaborador fez
+    abast_por_colab = por_colaborador(metricas, "abastecimento", "placas").reset_index(name="Qtd Abastecimentos")
+
+    # Gera o gráfico de pizza destacando o colaborador com mais abastecimentos
+    fig2 = grafico(
+        "pie",
+        abast_por_colab,
+        names="Colaborador",
+        values="Qtd Abastecimentos",
+        title="⛽ Percentual de Abastecimentos por Colaborador",
+        traces=dict(
+            textinfo="percent+label+value",
+            pull=[0.05 if i == abast_por_colab["Qtd Abastecimentos"].idxmax() else 0 for i in range(len(abast_por_colab))]
+        ),
+        layout=dict(title_x=0, showlegend=True),
+    )
+    return fig2
+
+def fig_lancamentos(df_filtrado, metricas):
+    if contagem(metricas, "lançamento") == 0:
+        return None
+
+    # Quantos lançamentos cada colaborador fez
+    lanc_por_colab = por_colaborador(metricas, "lançamento", "placas").reset_index(name="Qtd Lançamentos")
+
+    # Gráfico de pizza com exibição e destaque
+    fig3 = grafico(
+        "pie",
+        lanc_por_colab,
+        names="Colaborador",
+        values="Qtd Lançamentos",
+        title="🚛 Percentual de Lançamentos de Viagem por Colaborador",
+        traces=dict(
+            textinfo="percent+label+value",
+            pull=[0.05 if i == lanc_por_colab["Qtd Lançamentos"].idxmax() else 0 for i in range(len(lanc_por_colab))],
+            texttemplate="%{label}<br>%{percent:.1%}<br>%{value}"
+        ),
+        layout=dict(title_x=0, showlegend=True),
+    )
+    return fig3
+
+def fig_tempo_medio(df_filtrado, metricas):
+    tempo_medio = (
+        metricas["tempo_medio_por_tipo"]
+        .reset_index(name="Total (min)")
+        .sort_values("Total (min)", ascending=False)
+    )
+    tempo_medio["Total (min)"] = tempo_medio["Total (min)"].round(1)
+    fig = grafico(
+        "bar",
+        tempo_medio,
+        x="Tipo",
+        y="Total (min)",
+        text_auto=".1f",
+        title="Tempo médio por tipo de operação (em minutos)",
+        color="Tipo"
+    )
+    return fig
 
-import plotly.express as px
+def fig_tempo_ocioso(df_filtrado, metricas):
+    TEMPO_ESPERADO_H = 7
+    tempo_trabalhado = (
+        df_filtrado.groupby(["Colaborador", "Data"], observed=True)["Total (min)"]
+        .sum()
+        .reset_index()
+        .rename(columns={"Total (min)": "Tempo trabalhado (min)"})
+    )
+    tempo_trabalhado["Tempo trabalhado (h)"] = tempo_trabalhado["Tempo trabalhado (min)"] / 60
+    tempo_trabalhado["Tempo ocioso (h)"] = TEMPO_ESPERADO_H - tempo_trabalhado["Tempo trabalhado (h)"]
+    tempo_trabalhado["Tempo ocioso (h)"] = tempo_trabalhado["Tempo ocioso (h)"].clip(lower=0)
+    tempo_trabalhado["% Ociosidade"] = (tempo_trabalhado["Tempo ocioso (h)"] / TEMPO_ESPERADO_H * 100).round(1)
+
+    fig = grafico(
+        "bar",
+        tempo_trabalhado,
+        x="Colaborador",
+        y="Tempo ocioso (h)",
+        text_auto=".2f",
+        color="Colaborador",
+        title="Tempo Ocioso (em horas, diferença das 8h previstas)"
+    )
+    return fig
+
+# rótulo da aba -> (função da figura, aviso quando não há dados)
+FIGURAS = {
+    "Quantidade por Operação": (fig_operacoes, None),
+    "Quantidade por Destino": (fig_destinos, None),
+    "Percentual de baixa": (fig_baixas, "⚠️ Nenhum dado de baixa encontrado."),
+    "Percentual de abastecimento": (fig_abastecimentos, "⚠️ Nenhum dado de abastecimento encontrado."),
+    "Percentual de lançamento de viagem": (fig_lancamentos, "⚠️ Nenhum dado de lançamento encontrado."),
+    "Tempo médio por operação": (fig_tempo_medio, None),
+    "Tempo médio ocioso por colaborador": (fig_tempo_ocioso, None),
+}
+
+def construir_figura(df, df_cte, aba, *filtros):
+    df_filtrado, _ = servico_dados().memo(["fechamento", "cte"], filtrar_fechamento, *filtros)
+    metricas = servico_dados().memo(["fechamento", "cte"], metricas_fechamento, *filtros)
+    return FIGURAS[aba][0](df_filtrado, metricas)
+
+def mostrar_aba(aba, filtros):
+    fig = servico_dados().memo(["fechamento", "cte"], construir_figura, aba, *filtros)
+    if fig is None:
+        st.warning(FIGURAS[aba][1])
+    else:
+        st.plotly_chart(fig, use_container_width=True)
 
-df = fechamento()
-df_cte = conectData()
+def _tarefas_ativas():
+    for id_tarefa in st.session_state.get("tarefas_relatorio", [])[-5:]:
+        tarefa = fila_tarefas().status(id_tarefa)
+        if tarefa and tarefa["status"] in (NA_FILA, EXECUTANDO):
+            return True
+    return False
+
+def _painel_tarefas(atualizando):
+    for id_tarefa in reversed(st.session_state.get("tarefas_relatorio", [])[-5:]):
+        tarefa = fila_tarefas().status(id_tarefa)
+        if tarefa is None:
+            continue
+        if tarefa["status"] == CONCLUIDA:
+            st.success(f"✅ {tarefa['descricao']} enviado com sucesso!")
+        elif tarefa["status"] in (FALHOU, INTERROMPIDA):
+            st.error(f"❌ {tarefa['descricao']}: {tarefa['status']} ({tarefa.get('erro') or 'sem detalhes'})")
+        else:
+            st.info(f"⏳ {tarefa['descricao']}: {tarefa['status']} (tentativa {tarefa['tentativa']})")
+    # Tudo terminou: um rerun completo remonta o painel sem o timer
+    if atualizando and not _tarefas_ativas():
+        st.rerun()
+
+# Consulta o status dos relatórios desta sessão a cada poucos segundos, sem
+# rerodar a página inteira; o timer só existe enquanto há tarefa na fila ou
+# executando
+def painel_tarefas():
+    ativas = _tarefas_ativas()
+    st.fragment(_painel_tarefas, run_every=3 if ativas else None)(ativas)
 
 def main(): 
     st.set_page_config(
@@ -16,6 +242,13 @@ def main():
     )   
     
     st.title("📊 Fechamento Operacional")
+
+    # Baixa em paralelo tudo que a página e o relatório usam; o relatório
+    # reaproveita os frames já carregados no serviço.
+    with st.spinner("Carregando planilhas..."):
+        dados = obter_dados(["fechamento", "cte", "recebimento"])
+    df = dados["fechamento"]
+    df_cte = dados["cte"]
     
  # ============================= Filtros =======================================
     with st.sidebar:
@@ -36,21 +269,11 @@ def main():
             options=["Todos", *sorted(df["Tipo"].dropna().unique().tolist())]
         )
        
-        df_filtrado = df[
-            (df["Data"] >= pd.to_datetime(data_inicial)) &
-            (df["Data"] <= pd.to_datetime(data_final))
-        ]
-        df_filtrado_cte = df_cte[
-            (df_cte["Data"] >= pd.to_datetime(data_inicial)) &
-            (df_cte["Data"] <= pd.to_datetime(data_final))
-        ]
-         
-        
-        if colaborador != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["Colaborador"] == colaborador]
-
-        if tipo_operacao != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["Tipo"] == tipo_operacao]
+        # Memorizado por (versão dos dados, filtros): voltar a um filtro recente é imediato
+        df_filtrado, df_filtrado_cte = servico_dados().memo(
+            ["fechamento", "cte"], filtrar_fechamento,
+            data_inicial, data_final, colaborador, tipo_operacao
+        )
 
         # Botão para enviar relatório
         if st.button("📊 Gerar e Enviar Relatório"):
@@ -81,250 +304,73 @@ def main():
 
                     df_filtrado = df_filtrado[df_filtrado["Colaborador"].isin(colab)].reset_index(drop=True)
 
-                    enviar_relatorio_email(df_filtrado, remetente, senha, destinatario, ocorrencias, turno, df_filtrado_cte)
+                    # Gera e envia em segundo plano; o status aparece abaixo.
+                    # Uma tentativa só: repetir a tarefa remontaria o relatório
+                    # com dados mais novos e, se o servidor já tiver aceitado a
+                    # mensagem, duplicaria o e-mail. Falhas de conexão/login são
+                    # repetidas pelo próprio transporte (envio_email.py)
+                    from relatorios import enviar_relatorio_email
+
+                    id_tarefa = fila_tarefas().enviar(
+                        f"Relatório - {turno}",
+                        enviar_relatorio_email,
+                        df_filtrado, remetente, senha, destinatario, ocorrencias, turno, df_filtrado_cte,
+                        tentativas=1
+                    )
                     # st.dataframe(colab, use_container_width=True)
                     # st.dataframe(df_filtrado_cte, use_container_width=True)
                     
-                    st.success("✅ Relatório enviado com sucesso!")
+                    st.session_state.setdefault("tarefas_relatorio", []).append(id_tarefa)
                     st.session_state["mostrar_form"] = False
 
+        painel_tarefas()
+
     # ==================== Cabeçalho ====================
+    filtros = (data_inicial, data_final, colaborador, tipo_operacao)
+    metricas = servico_dados().memo(["fechamento", "cte"], metricas_fechamento, *filtros)
+    total = metricas["total"]
+
     col1, col2, col3 = st.columns(3)
     # st.dataframe(df_cte, use_container_width=True)
-    lancamentos = df_filtrado[df_filtrado['Tipo'] == "Lançamento"]
+    lancamentos = contagem(metricas, "lançamento")
     col1.metric(
         label="📦 Total de Operações",
-        value=f"{lancamentos.shape[0]:,.0f}",
-        delta=f"{(lancamentos.shape[0] / df_filtrado.shape[0] * 100):.1f}%" if df_filtrado.shape[0] > 0 else "0%"
+        value=f"{lancamentos:,.0f}",
+        delta=f"{(lancamentos / total * 100):.1f}%" if total > 0 else "0%"
     )
     
-    abastecimentos = df_filtrado[df_filtrado['Tipo'] == "Abastecimento"]
+    abastecimentos = contagem(metricas, "abastecimento")
     col2.metric(
         label="⛽ Abastecimento",
-        value=f"{abastecimentos.shape[0]:,.0f}",
-        delta=f"{(abastecimentos.shape[0] / df_filtrado.shape[0] * 100):.1f}%" if df_filtrado.shape[0] > 0 else "0%"
+        value=f"{abastecimentos:,.0f}",
+        delta=f"{(abastecimentos / total * 100):.1f}%" if total > 0 else "0%"
     )
 
     col3.metric(
         label="💰 Pedágio",
-        value=f"{df_filtrado[df_filtrado['Pedágio'] == True].shape[0]:,.0f}",
-        delta=f"{(df_filtrado['Pedágio'].mean()*100 if df_filtrado.shape[0] > 0 else 0):.1f}%"
+        value=f"{metricas['pedagios']:,.0f}",
+        delta=f"{metricas['pedagio_pct']:.1f}%"
     )
 
     # ==================== Gráficos ====================
-    st.subheader("🧮 Visão Geral das Operações")
-    aba1, aba2 = st.tabs(["Quantidade por Operação", "Quantidade por Destino"])
-
-    with aba1:
-        tipo_sum = (
-            df_filtrado.groupby("Tipo")["Total (min)"]
-            .count()
-            .sort_values(ascending=False)
-            .reset_index()
-        )
-        tipo_sum.columns = ["Tipo de Operação", "Quantidade"]
-        fig = px.bar(
-            tipo_sum,
-            x="Tipo de Operação",
-            y="Quantidade",
-            text_auto=True,
-            title="📊 Quantidade de Operações por Tipo",
-            color="Tipo de Operação",
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    with aba2:
-        # Filtra apenas lançamentos (com lowercase)
-        df_lanc = df_filtrado[df_filtrado["Tipo"].str.lower() == "lançamento"]
-
-        # Agrupa e conta por destino
-        dest_sum = (
-            df_lanc.groupby("Destino")["Total (min)"]
-            .count()
-            .sort_values(ascending=False)
-            .head(10)
-            .reset_index()
-        )
-
-        dest_sum.columns = ["Destino", "Quantidade"]
-
-        # Cria o gráfico
-        fig = px.bar(
-            dest_sum,
-            x="Destino",
-            y="Quantidade",
-            text_auto=True,
-            color="Destino",
-            title="🏁 Destinos com Mais Lançamentos de Viagem",
-        )
-
-        # Personalizações visuais
-        fig.update_layout(
-            xaxis_title="Destino",
-            yaxis_title="Quantidade de Lançamentos",
-            title_x=0,
-            showlegend=True,
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-        )
-
-        fig.update_traces(textposition="outside")
-
-        # Exibe o gráfico
-        st.plotly_chart(fig, use_container_width=True)
 
-        # Exibe a tabela abaixo para referência
-        # st.dataframe(dest_sum, use_container_width=True, hide_index=True)
+    st.subheader("🧮 Visão Geral das Operações")
+    aba = abas_preguicosas(["Quantidade por Operação", "Quantidade por Destino"], key="aba_visao_geral")
+    mostrar_aba(aba, filtros)
 
     # ==================== Detalhamento ====================
     st.subheader("📋 Detalhamento das Operações")
-    df_baixa = df_filtrado[df_filtrado["Tipo"].str.lower() == "baixa"]
-    df_baixa["QTD de CT-e"] = pd.to_numeric(df_baixa["QTD de CT-e"], errors="coerce").fillna(0)
-    cte_por_colab = (
-        df_baixa.groupby("Colaborador")["QTD de CT-e"]
-        .sum()
-        .reset_index()
-        .sort_values("QTD de CT-e", ascending=False)
-    )
-
-    aba3, aba4, aba5 = st.tabs([
+    aba = abas_preguicosas([
         "Percentual de baixa",
         "Percentual de abastecimento",
         "Percentual de lançamento de viagem"
-    ])
-
-    # ======== ABA 3 - BAIXAS ========
-    with aba3:
-
-        if not df_baixa.empty:
-            cte_por_colab = df_baixa.groupby("Colaborador", as_index=False)["QTD de CT-e"].sum()
-
-            fig = px.pie(
-                cte_por_colab,
-                names="Colaborador",
-                values="QTD de CT-e",
-                title="📦 Percentual de CT-e Baixados por Colaborador",
-            )
-
-            fig.update_traces(
-                textinfo="percent+label+value",
-                pull=[0.05 if i == cte_por_colab["QTD de CT-e"].idxmax() else 0 for i in range(len(cte_por_colab))]
-            )
+    ], key="aba_detalhamento")
+    mostrar_aba(aba, filtros)
 
-            fig.update_layout(title_x=0, showlegend=True)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("⚠️ Nenhum dado de baixa encontrado.")
-
-
-    with aba4:
-        # Corrige o filtro (tudo minúsculo)
-        df_abast = df_filtrado[df_filtrado["Tipo"].str.lower() == "abastecimento"]
-
-        if not df_abast.empty:
-            # Agrupa por colaborador e conta quantas placas (ou abastecimentos) fez
-            abast_por_colab = df_abast.groupby("Colaborador", as_index=False)["Placa"].count()
-            abast_por_colab.rename(columns={"Placa": "Qtd Abastecimentos"}, inplace=True)
-
-            # Gera o gráfico de pizza
-            fig2 = px.pie(
-                abast_por_colab,
-                names="Colaborador",
-                values="Qtd Abastecimentos",
-                title="⛽ Percentual de Abastecimentos por Colaborador",
-            )
-
-            # Destaca o colaborador com mais abastecimentos
-            fig2.update_traces(
-                textinfo="percent+label+value",
-                pull=[0.05 if i == abast_por_colab["Qtd Abastecimentos"].idxmax() else 0 for i in range(len(abast_por_colab))]
-            )
-
-            fig2.update_layout(title_x=0, showlegend=True)
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Mostra os dados abaixo do gráfico
-            # st.dataframe(abast_por_colab, use_container_width=True, hide_index=True)
-
-        else:
-            st.warning("⚠️ Nenhum dado de abastecimento encontrado.")
-
-    with aba5:
-        # Corrigir o filtro (minúsculo)
-        df_lanc = df_filtrado[df_filtrado["Tipo"].str.lower() == "lançamento"]
-
-        if not df_lanc.empty:
-            # Agrupa por colaborador e conta quantos lançamentos
-            lanc_por_colab = df_lanc.groupby("Colaborador", as_index=False)["Placa"].count()
-            lanc_por_colab.rename(columns={"Placa": "Qtd Lançamentos"}, inplace=True)
-
-            # Gráfico de pizza
-            fig3 = px.pie(
-                lanc_por_colab,
-                names="Colaborador",
-                values="Qtd Lançamentos",
-                title="🚛 Percentual de Lançamentos de Viagem por Colaborador",
-            )
-
-            # Configura exibição e destaque
-            fig3.update_traces(
-                textinfo="percent+label+value",
-                pull=[0.05 if i == lanc_por_colab["Qtd Lançamentos"].idxmax() else 0 for i in range(len(lanc_por_colab))],
-                texttemplate="%{label}<br>%{percent:.1%}<br>%{value}"
-            )
-
-            fig3.update_layout(title_x=0, showlegend=True)
-            st.plotly_chart(fig3, use_container_width=True)
-
-            # Mostra os dados em tabela
-            # st.dataframe(lanc_por_colab, use_container_width=True, hide_index=True)
-
-        else:
-            st.warning("⚠️ Nenhum dado de lançamento encontrado.")
     # ==================== Insights ====================
     st.subheader("💡 Insights Automáticos")
-    aba3, aba4 = st.tabs(["Tempo médio por operação", "Tempo médio ocioso por colaborador"])
-
-    with aba3:
-        tempo_medio = (
-            df_filtrado.groupby("Tipo")["Total (min)"]
-            .mean()
-            .reset_index()
-            .sort_values("Total (min)", ascending=False)
-        )
-        tempo_medio["Total (min)"] = tempo_medio["Total (min)"].round(1)
-        fig = px.bar(
-            tempo_medio,
-            x="Tipo",
-            y="Total (min)",
-            text_auto=".1f",
-            title="Tempo médio por tipo de operação (em minutos)",
-            color="Tipo"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-    with aba4:  
-        TEMPO_ESPERADO_H = 7
-        tempo_trabalhado = (
-            df_filtrado.groupby(["Colaborador", "Data"])["Total (min)"]
-            .sum()
-            .reset_index()
-            .rename(columns={"Total (min)": "Tempo trabalhado (min)"})
-        )
-        tempo_trabalhado["Tempo trabalhado (h)"] = tempo_trabalhado["Tempo trabalhado (min)"] / 60
-        tempo_trabalhado["Tempo ocioso (h)"] = TEMPO_ESPERADO_H - tempo_trabalhado["Tempo trabalhado (h)"]
-        tempo_trabalhado["Tempo ocioso (h)"] = tempo_trabalhado["Tempo ocioso (h)"].clip(lower=0)
-        tempo_trabalhado["% Ociosidade"] = (tempo_trabalhado["Tempo ocioso (h)"] / TEMPO_ESPERADO_H * 100).round(1)
-
-        fig = px.bar(
-            tempo_trabalhado,
-            x="Colaborador",
-            y="Tempo ocioso (h)",
-            text_auto=".2f",
-            color="Colaborador",
-            title="Tempo Ocioso (em horas, diferença das 8h previstas)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    aba = abas_preguicosas(["Tempo médio por operação", "Tempo médio ocioso por colaborador"], key="aba_insights")
+    mostrar_aba(aba, filtros)
 
     # ==================== Alertas ====================
     if df['CT-e emitido'].mean() < 0.7:
@@ -0,0 +1,46 @@
+from servico import filtrar_periodo
+
+# ============================= Rollups diários =============================
+# Tabelas pequenas calculadas uma vez por atualização dos dados (via
+# ServicoDados.derivado). Os filtros do dashboard são respondidos a partir
+# delas, então o custo de cada interação não cresce com o histórico.
+DIMENSOES_CTE = ["Data", "Turno", "Responsável"]
+DIMENSOES_OCORRENCIAS = ["Data", "Turno", "Tipo de Erro", "Status", "Responsável correção"]
+
+# O groupby ordena pelas chaves, mas com dropna=False o grupo NaT vai para o
+# fim; reordenado com NaT no começo, o rollup fica na ordem que
+# filtrar_periodo(ordenado=True) espera
+def _por_data(rollup):
+    if "Data" not in rollup.columns:
+        return rollup
+    return rollup.sort_values("Data", kind="stable", na_position="first", ignore_index=True)
+
+def rollup_cte(df):
+    dimensoes = [c for c in DIMENSOES_CTE if c in df.columns]
+    return _por_data(
+        df.groupby(dimensoes, observed=True, dropna=False)["Quantidade de CTe"]
+        .sum()
+        .reset_index()
+    )
+
+def rollup_ocorrencias(df):
+    dimensoes = [c for c in DIMENSOES_OCORRENCIAS if c in df.columns]
+    return _por_data(
+        df.groupby(dimensoes, observed=True, dropna=False)
+        .size()
+        .reset_index(name="Qtde")
+    )
+
+# Recorta o rollup pelo período e pelos filtros {coluna: valor}; valor None = todos.
+# O rollup sai ordenado por Data (_por_data), então o período é uma busca binária.
+def filtrar_rollup(rollup, data_inicio, data_fim, filtros=None):
+    rollup = filtrar_periodo(rollup, data_inicio, data_fim, ordenado=True)
+    for coluna, valor in (filtros or {}).items():
+        if valor is not None and coluna in rollup.columns:
+            rollup = rollup[rollup[coluna] == valor]
+    return rollup
+
+# Soma `medida` por `coluna` (ou por dia, se coluna == "Data")
+def somar_por(rollup, coluna, medida):
+    chave = rollup["Data"].dt.date if coluna == "Data" else coluna
+    return rollup.groupby(chave, observed=True)[medida].sum()
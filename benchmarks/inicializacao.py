@@ -0,0 +1,105 @@
+# benchmarks/inicializacao.py
+# Tempo de import de cada página antes do primeiro desenho (user-019): roda
+# só as instruções import/from do topo de cada página num processo novo com
+# python -X importtime e soma o tempo acumulado dos imports de primeiro
+# nível. Com --comparar, mede também outra revisão (via git worktree), por
+# exemplo a anterior à troca por imports preguiçosos:
+#
+#   python -m benchmarks.inicializacao --comparar 24a24ff~1
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGINAS = ["Hello.py", "pages/1_Dashboard.py", "pages/2_CT_e.py", "pages/4_Cargas.py"]
+# Bibliotecas que pesam no primeiro desenho, listadas quando aparecem
+PESADAS = [
+    "streamlit", "pandas", "plotly", "plotly.express", "matplotlib", "relatorios",
+    "folium", "streamlit_folium", "geopy", "openrouteservice", "smtplib", "email.mime.multipart",
+]
+
+
+# Só os imports do topo do arquivo, sem executar a página
+def importacoes(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    return "\n".join(ast.unparse(n) for n in arvore.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+
+# (ms somados dos imports de primeiro nível, {módulo: ms acumulados})
+def _importtime(raiz, codigo):
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=raiz, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": raiz},
+    )
+    if processo.returncode:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+    total, acumulado = 0, {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        campos = linha[len("import time:"):].split("|")
+        if len(campos) != 3 or not campos[1].strip().isdigit():
+            continue  # cabeçalho
+        microssegundos, modulo = int(campos[1]), campos[2]
+        acumulado[modulo.strip()] = microssegundos / 1000
+        if len(modulo) - len(modulo.lstrip()) == 1:  # primeiro nível
+            total += microssegundos
+    return total / 1000, acumulado
+
+
+def medir_pagina(raiz, pagina, repeticoes):
+    codigo = importacoes(os.path.join(raiz, pagina))
+    _importtime(raiz, codigo)  # aquece os .pyc
+    medicoes = [_importtime(raiz, codigo) for _ in range(repeticoes)]
+    total = statistics.median(m[0] for m in medicoes)
+    pesadas = {
+        nome: statistics.median(m[1].get(nome, 0.0) for m in medicoes)
+        for nome in PESADAS if nome in medicoes[0][1]
+    }
+    return total, pesadas
+
+
+@contextmanager
+def _arvore(revisao):
+    if revisao is None:
+        yield RAIZ
+        return
+    destino = tempfile.mkdtemp(prefix="inicializacao-")
+    subprocess.run(["git", "worktree", "add", "--detach", destino, revisao], cwd=RAIZ, check=True, capture_output=True)
+    try:
+        yield destino
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", destino], cwd=RAIZ, capture_output=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de import das páginas.")
+    parser.add_argument("--comparar", help="revisão git medida como referência")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    revisoes = ([args.comparar] if args.comparar else []) + [None]
+    for revisao in revisoes:
+        print(f"== {revisao or 'árvore atual'}")
+        with _arvore(revisao) as raiz:
+            for pagina in PAGINAS:
+                if not os.path.exists(os.path.join(raiz, pagina)):
+                    continue
+                try:
+                    total, pesadas = medir_pagina(raiz, pagina, args.repeticoes)
+                except RuntimeError as e:
+                    print(f"  {pagina:<24} erro: {e}")
+                    continue
+                detalhe = ", ".join(f"{nome} {ms:.0f}" for nome, ms in sorted(pesadas.items(), key=lambda i: -i[1]))
+                print(f"  {pagina:<24} {total:8.0f} ms  ({detalhe})")
+
+
+if __name__ == "__main__":
+    main()
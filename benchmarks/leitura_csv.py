@@ -0,0 +1,91 @@
+# benchmarks/leitura_csv.py
+# Parse do fechamento (user-005): o caminho antigo (motor C, to_datetime sem
+# formato, to_timedelta em texto e três str.upper().isin) x o atual
+# (database._ler_csv + _tratar_fechamento) com o motor C e com o pyarrow,
+# sobre uma exportação sintética no formato da planilha.
+#
+#   python -m benchmarks.leitura_csv --linhas 500000 --repeticoes 3
+import argparse
+import io
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import database
+from benchmarks.medicao import medir, relatar
+
+_FLAGS = ["CT-e emitido", "Recepção de NFs", "Pedágio"]
+
+
+# Exportação do Google Sheets do fechamento: uma linha de título antes do
+# cabeçalho (leitura com header=1), datas dd/mm/aaaa, durações HH:MM:SS e
+# flags TRUE/FALSE com algumas células vazias
+def gerar_csv(linhas, semente=0):
+    rng = np.random.default_rng(semente)
+    datas = pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, linhas), unit="D")
+    segundos = rng.integers(60, 6 * 3600, linhas)
+    df = pd.DataFrame({
+        "Data": datas.strftime("%d/%m/%Y"),
+        "Colaborador": rng.choice([f"Colaborador {i}" for i in range(40)], linhas),
+        "Tipo": rng.choice(["Coleta", "Entrega", "Transferência"], linhas),
+        "Destino": rng.choice(["Itapecerica da Serra", "Curitiba", "Joinville", "Porto Alegre"], linhas),
+        "Placa": [f"ABC{i % 10000:04d}" for i in range(linhas)],
+        "Turno": rng.choice(["Manhã", "Tarde", "Noite"], linhas),
+        "QTD de CT-e": rng.integers(0, 30, linhas),
+        "Total (min)": [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in segundos],
+        **{flag: rng.choice(["TRUE", "FALSE", ""], linhas, p=[0.6, 0.35, 0.05]) for flag in _FLAGS},
+    })
+    return "Fechamento diário" + "," * (df.shape[1] - 1) + "\n" + df.to_csv(index=False)
+
+
+# Tratamento do fechamento antes do user-005
+def caminho_antigo(texto):
+    df = pd.read_csv(io.StringIO(texto), header=1)
+    df = df.dropna(subset=["Placa"])
+    df["Data"] = pd.to_datetime(df["Data"], errors="coerce", dayfirst=True)
+    df["Total (min)"] = pd.to_timedelta(df["Total (min)"], errors="coerce").dt.total_seconds() / 60
+    for flag in _FLAGS:
+        df[flag] = df[flag].astype(str).str.upper().isin(["TRUE", "VERDADEIRO", "1"])
+    return df
+
+
+def caminho_atual(texto, motor):
+    database.MOTOR_CSV = motor
+    return database._tratar_fechamento(database._ler_csv(texto, "fechamento"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o parse do fechamento.")
+    parser.add_argument("--linhas", type=int, default=500_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    texto = gerar_csv(args.linhas)
+    print(f"{args.linhas:,} linhas, {len(texto) / 1024 ** 2:.1f} MB de CSV")
+
+    motores = ["c"]
+    try:
+        import pyarrow  # noqa: F401
+        motores.append("pyarrow")
+    except ImportError:
+        print("  (pyarrow não instalado: só o motor C)")
+
+    esperado = caminho_antigo(texto)
+    for motor in motores:
+        obtido = caminho_atual(texto, motor)
+        for coluna in ["Data", "Total (min)", *_FLAGS]:
+            pd.testing.assert_series_equal(
+                obtido[coluna].reset_index(drop=True), esperado[coluna].reset_index(drop=True),
+                check_dtype=False, check_names=False,
+            )
+
+    antigo = medir(lambda: caminho_antigo(texto), args.repeticoes)
+    relatar("antigo (C + inferência de data)", antigo)
+    for motor in motores:
+        relatar(f"atual, motor {motor}", medir(lambda: caminho_atual(texto, motor), args.repeticoes), antigo)
+
+
+if __name__ == "__main__":
+    main()
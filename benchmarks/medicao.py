@@ -0,0 +1,25 @@
+# benchmarks/medicao.py
+# Utilitários comuns aos benchmarks. Cada benchmark gera os próprios dados
+# sintéticos e roda a partir da raiz do repositório:
+#
+#   python -m benchmarks.leitura_csv     # user-005: motor pyarrow x pandas
+#   python -m benchmarks.inicializacao   # user-019: tempo de import do app
+#   python -m benchmarks.periodo         # user-008: recorte por data
+#   python -m benchmarks.pedagios        # user-021: pedágios na rota
+import statistics
+import time
+
+
+# Mediana, em ms, de `repeticoes` execuções de func()
+def medir(func, repeticoes=5):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def relatar(rotulo, ms, referencia=None):
+    ganho = f"  ({referencia / ms:.1f}x)" if referencia else ""
+    print(f"  {rotulo:<44} {ms:10.2f} ms{ganho}")
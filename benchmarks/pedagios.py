@@ -0,0 +1,104 @@
+# benchmarks/pedagios.py
+# Pedágios na rota (user-021/022) numa rota sintética longa SP -> Sul: o
+# laço antigo (geodesic de cada ponto contra todas as praças, medido numa
+# amostra de pontos e extrapolado), o índice em grade sobre a rota inteira e
+# o índice com o corredor reduzido (o caminho usado pela página e pelo lote).
+# Os dois índices são conferidos contra uma busca exaustiva.
+#
+#   python -m benchmarks.pedagios --passo-m 20 --amostra-antiga 300
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicao import medir, relatar
+from pedagios import RAIO_PEDAGIO_KM, IndicePracas, haversine_km
+from rotas import FOLGA_CORREDOR_KM, corredor, densificar
+
+_PRACAS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "pracas.csv")
+_SAO_PAULO = (-23.55, -46.63)
+_PORTO_ALEGRE = (-30.03, -51.23)
+
+
+def carregar_pracas():
+    df = pd.read_csv(_PRACAS, sep=";", decimal=",", encoding="latin-1")
+    return df.rename(columns={"latitude": "lat", "longitude": "lon"}).dropna(subset=["lat", "lon"])
+
+
+# Rota São Paulo -> Porto Alegre passando ao lado das praças da Régis
+# Bittencourt (BR-116 até Curitiba), da BR-376 e da BR-101 (desvio lateral
+# de até ~6 km, para haver praças perto do limite de 5 km), com um ponto a
+# cada `passo_m` metros como a geometria do ORS
+def gerar_rota(pracas, passo_m, semente=0):
+    rng = np.random.default_rng(semente)
+    lat, rodovia = pracas["lat"], pracas["rodovia"]
+    caminho = pracas[
+        ((rodovia == "BR-116") & lat.between(-25.5, -23.7))
+        | ((rodovia == "BR-376") & (lat < -25.5))
+        | ((rodovia == "BR-101") & pracas["uf"].isin(["SC", "RS"]))
+    ].drop_duplicates(["lat", "lon"]).sort_values("lat", ascending=False)
+    desvio = rng.uniform(-0.055, 0.055, size=(len(caminho), 2))
+    pontos = [_SAO_PAULO, *map(tuple, caminho[["lat", "lon"]].to_numpy() + desvio), _PORTO_ALEGRE]
+    return densificar(pontos, passo_m)
+
+
+# Laço anterior ao user-021: geodesic de cada ponto contra todas as praças
+def caminho_antigo(pracas, coords):
+    from geopy.distance import geodesic
+
+    df = pracas.copy()
+    df["coords"] = list(zip(df["lat"], df["lon"]))
+    encontradas = []
+    for ponto in coords:
+        proximos = df[df["coords"].apply(lambda c: geodesic(c, ponto).km < RAIO_PEDAGIO_KM)]
+        encontradas.extend(proximos.index)
+    return encontradas
+
+
+# Referência: distância de cada praça a todos os pontos, em blocos
+def exaustivo(indice, coords, bloco=20000):
+    pontos = np.asarray(coords, dtype=float)
+    primeiro = {}
+    for inicio in range(0, len(pontos), bloco):
+        trecho = pontos[inicio:inicio + bloco]
+        dist = haversine_km(trecho[:, [0]], trecho[:, [1]], indice.lat[None, :], indice.lon[None, :])
+        for praca in np.flatnonzero((dist < indice.raio_km).any(axis=0)):
+            primeiro.setdefault(praca, inicio + int(np.argmax(dist[:, praca] < indice.raio_km)))
+    return [praca for praca, _ in sorted(primeiro.items(), key=lambda item: (item[1], item[0]))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede a busca de pedágios na rota.")
+    parser.add_argument("--passo-m", type=float, default=20)
+    parser.add_argument("--amostra-antiga", type=int, default=300, help="pontos medidos no laço antigo (0 pula)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pracas = carregar_pracas()
+    coords = gerar_rota(pracas, args.passo_m)
+    indice = IndicePracas(pracas, folga_km=FOLGA_CORREDOR_KM)
+    reduzido = corredor(coords)
+    print(f"{len(pracas)} praças, rota com {len(coords):,} pontos (corredor com {len(reduzido):,})")
+
+    esperado = exaustivo(indice, coords)
+    assert indice.na_rota(coords) == esperado
+    assert indice.na_rota(coords, reduzido) == esperado
+    print(f"  {len(esperado)} praças a menos de {RAIO_PEDAGIO_KM} km da rota")
+
+    antigo = None
+    if args.amostra_antiga:
+        amostra = coords[:: max(len(coords) // args.amostra_antiga, 1)]
+        por_ponto = medir(lambda: caminho_antigo(pracas, amostra), 1) / len(amostra)
+        antigo = por_ponto * len(coords)
+        relatar(f"laço antigo (estimado por {len(amostra)} pontos)", antigo)
+    relatar("índice, rota inteira", medir(lambda: indice.na_rota(coords), args.repeticoes), antigo)
+    relatar(
+        "índice + corredor (inclui corredor())",
+        medir(lambda: indice.na_rota(coords, corredor(coords)), args.repeticoes),
+        antigo,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/periodo.py
+# Recorte por período (user-008): máscara booleana sobre o histórico inteiro
+# x filtrar_periodo com busca binária, num frame sintético ordenado por Data
+# como os do ServicoDados (NaT no começo).
+#
+#   python -m benchmarks.periodo --linhas 1000000 --repeticoes 20
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicao import medir, relatar
+from servico import _ordenar, filtrar_periodo
+
+
+def gerar(linhas, anos=3, fracao_nat=0.001, semente=0):
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp("2022-01-01")
+    segundos = rng.integers(0, anos * 365 * 86400, linhas)
+    datas = pd.Series(inicio + pd.to_timedelta(segundos, unit="s"))
+    datas[rng.random(linhas) < fracao_nat] = pd.NaT
+    df = pd.DataFrame({
+        "Data": datas,
+        "Colaborador": pd.Categorical(rng.choice([f"colab {i}" for i in range(40)], linhas)),
+        "Quantidade": rng.integers(1, 50, linhas),
+    })
+    return _ordenar(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o recorte por período.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df = gerar(args.linhas)
+    fim_historico = df["Data"].max().normalize()
+    print(f"{len(df):,} linhas, {df['Data'].min():%d/%m/%Y} a {fim_historico:%d/%m/%Y}")
+
+    for rotulo, dias in (("1 dia", 0), ("30 dias", 29), ("1 ano", 364)):
+        inicio = fim_historico - pd.Timedelta(days=dias)
+        fim = fim_historico + pd.Timedelta(hours=23, minutes=59, seconds=59)
+
+        datas = df["Data"]
+        esperado = df[(datas >= inicio) & (datas <= fim)]
+        for ordenado in (True, False):
+            assert filtrar_periodo(df, inicio, fim, ordenado=ordenado).equals(esperado)
+
+        print(f"{rotulo} ({len(esperado):,} linhas):")
+        mascara = medir(lambda: df[(df["Data"] >= inicio) & (df["Data"] <= fim)], args.repeticoes)
+        relatar("máscara booleana", mascara)
+        relatar(
+            "filtrar_periodo(ordenado=True)",
+            medir(lambda: filtrar_periodo(df, inicio, fim, ordenado=True), args.repeticoes),
+            mascara,
+        )
+        relatar(
+            "filtrar_periodo (confere a ordem)",
+            medir(lambda: filtrar_periodo(df, inicio, fim), args.repeticoes),
+            mascara,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import streamlit as st
+
+# ============================= Abas preguiçosas =============================
+# st.tabs executa o conteúdo de todas as abas a cada rerun, mesmo as que não
+# estão visíveis. Aqui a aba é um seletor horizontal: a página só monta o
+# conteúdo do rótulo retornado, e a escolha fica no session_state.
+def abas_preguicosas(rotulos, key):
+    return st.radio(
+        "Aba",
+        rotulos,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=key,
+    )
+
+
+# ============================= Tabela paginada =============================
+# Envia ao navegador só a página visível. Busca e ordenação rodam no servidor
+# sobre o frame já filtrado (em cache); `total` pode vir dos rollups para não
+# precisar contar o frame inteiro.
+def tabela_paginada(df, key, total=None, tamanho_pagina=50, column_config=None):
+    colunas = list(df.columns)
+
+    col1, col2, col3, col4 = st.columns([2, 3, 2, 1], vertical_alignment="bottom")
+    coluna_busca = col1.selectbox("Buscar em", colunas, key=f"{key}_coluna_busca")
+    busca = col2.text_input("Buscar", "", key=f"{key}_busca", placeholder="Digite para filtrar...")
+    coluna_ordem = col3.selectbox("Ordenar por", colunas, key=f"{key}_ordem")
+    crescente = col4.toggle("Crescente", value=False, key=f"{key}_crescente")
+
+    if busca:
+        df = df[df[coluna_busca].astype(str).str.contains(busca, case=False, na=False, regex=False)]
+        total = len(df)
+    elif total is None:
+        total = len(df)
+
+    paginas = max((total - 1) // tamanho_pagina + 1, 1)
+    # Uma busca pode reduzir o número de páginas: a página guardada na sessão
+    # não pode passar do fim
+    if st.session_state.get(f"{key}_pagina", 1) > paginas:
+        st.session_state[f"{key}_pagina"] = paginas
+    pagina = st.number_input(
+        f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=f"{key}_pagina"
+    )
+    inicio = (pagina - 1) * tamanho_pagina
+
+    # Ordena só a coluna escolhida e materializa apenas as linhas da página.
+    # Colunas object podem misturar tipos: comparadas como texto
+    serie = df[coluna_ordem].reset_index(drop=True)
+    chave_ordem = (lambda s: s.astype(str)) if serie.dtype == object else None
+    ordem = serie.sort_values(ascending=crescente, kind="stable", key=chave_ordem).index
+    pagina_df = df.iloc[ordem[inicio:inicio + tamanho_pagina]]
+
+    st.dataframe(
+        pagina_df,
+        column_config=column_config,
+        width='stretch',
+        hide_index=True
+    )
+    st.caption(f"{total:,} registros · mostrando {inicio + 1 if total else 0}–{min(inicio + tamanho_pagina, total)}")
@@ -0,0 +1,137 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+
+from geocodificacao import geocodificar, normalizar
+from pedagios import pedagios_na_rota
+from rotas import buscar_rota, corredor, decodificar
+
+# ============================= Cotação de frete =============================
+# Frete = distância da rota x tarifa por km do veículo, mais os pedágios das
+# praças no caminho. cotar_lote cota muitas linhas remetente/destinatário/
+# veículo com no máximo COTACAO_CONCORRENCIA ao mesmo tempo; o ritmo das
+# chamadas externas fica por conta de geocodificacao (1 req/s) e rotas
+# (ORS_INTERVALO_S), e os caches dos dois evitam repetir consultas.
+# Para testar sem rede, aponte NOMINATIM_URL e ORS_URL para o
+# servicos_locais.py.
+FRETE_POR_KM = {
+    "Carreta": 7,
+    "Carreta Trucada": 8,
+    "Truck": 5,
+    "Rodo-trem": 15,
+    "Vanderleia": 11
+}
+COTACAO_CONCORRENCIA = int(os.environ.get("COTACAO_CONCORRENCIA", 4))
+
+_VEICULOS = {normalizar(v): v for v in FRETE_POR_KM}
+
+# Nome normalizado aceito na planilha -> coluna usada aqui
+_COLUNAS_LOTE = {
+    "remetente": "remetente",
+    "origem": "remetente",
+    "destinatario": "destinatario",
+    "destino": "destinatario",
+    "veiculo": "veiculo",
+    "tipo de veiculo": "veiculo",
+}
+
+
+# Linha do resultado com todas as colunas, para o CSV manter o mesmo formato
+# com ou sem erro
+def _resultado(remetente, destinatario, veiculo, erro=""):
+    return {
+        "Remetente": remetente,
+        "Destinatário": destinatario,
+        "Veículo": veiculo,
+        "Distância (km)": None,
+        "Tempo (h)": None,
+        "Frete (R$)": None,
+        "Pedágios (R$)": None,
+        "Praças": None,
+        "Total (R$)": None,
+        "Erro": erro,
+    }
+
+
+def cotar(remetente, destinatario, veiculo, indice):
+    resultado = _resultado(remetente, destinatario, veiculo)
+    veiculo = _VEICULOS.get(normalizar(veiculo), veiculo)
+    resultado["Veículo"] = veiculo
+    if veiculo not in FRETE_POR_KM:
+        resultado["Erro"] = "Veículo desconhecido"
+        return resultado
+
+    origem = geocodificar(remetente)
+    if not origem:
+        resultado["Erro"] = "Remetente não encontrado"
+        return resultado
+    destino = geocodificar(destinatario)
+    if not destino:
+        resultado["Erro"] = "Destinatário não encontrado"
+        return resultado
+
+    try:
+        rota = buscar_rota(origem, destino)
+    except requests.RequestException as e:
+        resultado["Erro"] = f"Erro ORS API: {e}"
+        return resultado
+    except RuntimeError as e:  # chave do ORS não configurada
+        resultado["Erro"] = str(e)
+        return resultado
+    if not rota:
+        resultado["Erro"] = "Rota não encontrada"
+        return resultado
+
+    distancia_km = rota["summary"]["distance"] / 1000
+    frete = distancia_km * FRETE_POR_KM[veiculo]
+    coords = decodificar(rota["geometry"])
+    pracas, pedagio = pedagios_na_rota(indice, coords, corredor(coords))
+    resultado.update({
+        "Distância (km)": round(distancia_km, 2),
+        "Tempo (h)": round(rota["summary"]["duration"] / 3600, 2),
+        "Frete (R$)": round(frete, 2),
+        "Pedágios (R$)": round(pedagio, 2),
+        "Praças": len(pracas),
+        "Total (R$)": round(frete + pedagio, 2),
+    })
+    return resultado
+
+
+# CSV ou XLSX com colunas remetente/destinatário/veículo (sem diferenciar
+# acentos e maiúsculas) -> DataFrame com remetente, destinatario, veiculo
+def ler_planilha_lote(conteudo, nome_arquivo):
+    if nome_arquivo.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(io.BytesIO(conteudo), dtype=str)
+    else:
+        df = pd.read_csv(io.BytesIO(conteudo), sep=None, engine="python", dtype=str, encoding="utf-8-sig")
+
+    df = df.rename(columns=lambda c: _COLUNAS_LOTE.get(normalizar(str(c)), c))
+    faltando = {"remetente", "destinatario", "veiculo"} - set(df.columns)
+    if faltando:
+        raise ValueError(f"Colunas ausentes na planilha: {', '.join(sorted(faltando))}")
+    df = df[["remetente", "destinatario", "veiculo"]].fillna("")
+    return df.apply(lambda coluna: coluna.str.strip())
+
+
+# Gera (posição da linha, resultado) conforme cada cotação termina. Se o
+# consumidor parar no meio (rerun da página), as cotações na fila são canceladas
+def cotar_lote(linhas, indice, concorrencia=COTACAO_CONCORRENCIA):
+    executor = ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix="cotacao")
+    try:
+        futuros = {
+            executor.submit(cotar, linha.remetente, linha.destinatario, linha.veiculo, indice): posicao
+            for posicao, linha in enumerate(linhas.itertuples(index=False))
+        }
+        for futuro in as_completed(futuros):
+            posicao = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                linha = linhas.iloc[posicao]
+                resultado = _resultado(linha["remetente"], linha["destinatario"], linha["veiculo"], str(e))
+            yield posicao, resultado
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
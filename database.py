@@ -1,29 +1,216 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import httpx
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-def conectData () :
-    df = pd.read_csv("https://docs.google.com/spreadsheets/d/1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0/export?format=csv&gid=1435904190")
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce", dayfirst=True)
+# ============================= Planilhas =============================
+# Base configurável para apontar os loaders para um servidor local de testes
+# (planilhas_locais.py serve as fixtures de database/fixtures)
+SHEETS_BASE_URL = os.environ.get("SHEETS_BASE_URL", "https://docs.google.com/spreadsheets/d")
+
+PLANILHAS = {
+    "cte": {"planilha": "1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0", "gid": "1435904190", "incremental": True},
+    "conhecimentos": {
+        "planilha": "1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0",
+        "gid": "2004182381",
+        "leitura": {"dtype": {"REMETENTE": str, "DESTINATARIO": str}},
+    },
+    "ocorrencias": {"planilha": "1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0", "gid": "0", "incremental": True},
+    "desacordos": {"planilha": "1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0", "gid": "1041434519", "incremental": True},
+    "fechamento": {
+        "planilha": "1EScFjmlwCXi212yQVz6b7sj-d7XniwlkR1lldTAQkRk",
+        "gid": "0",
+        "leitura": {"header": 1},
+        "incremental": True,
+    },
+    "recebimento": {
+        "planilha": "1588Wscg2jZBDM6kQKsfjEeLeA8p3cU2qkpmHqhbw4mk",
+        "gid": "514085568",
+        "leitura": {"header": 0},
+    },
+}
+
+def _url(nome):
+    planilha = PLANILHAS[nome]
+    return f"{SHEETS_BASE_URL}/{planilha['planilha']}/export?format=csv&gid={planilha['gid']}"
+
+def _chave(nome):
+    return f"{nome}_{PLANILHAS[nome]['gid']}"
+
+# ============================= Parse =============================
+# Motor do read_csv: o leitor CSV do pyarrow (multithread) quando instalado,
+# senão o motor C do pandas. MOTOR_CSV no ambiente força um dos dois.
+try:
+    import pyarrow  # noqa: F401
+    _MOTOR_PADRAO = "pyarrow"
+except ImportError:
+    _MOTOR_PADRAO = "c"
+MOTOR_CSV = os.environ.get("MOTOR_CSV", _MOTOR_PADRAO)
+
+FORMATO_DATA = "%d/%m/%Y"
+VERDADEIROS = ["TRUE", "VERDADEIRO", "1"]
+_DURACAO = r"^\s*(\d+):(\d{1,2}):(\d{1,2})\s*$"
+
+def _ler_csv(texto, nome, **extra):
+    leitura = {**PLANILHAS[nome].get("leitura", {}), **extra}
+    if MOTOR_CSV == "pyarrow":
+        try:
+            return pd.read_csv(io.BytesIO(texto.encode("utf-8")), engine="pyarrow", **leitura)
+        except ValueError as e:
+            # Linhas com número de colunas irregular etc.: o motor C é mais tolerante
+            print(f"⚠️ pyarrow não leu {nome}, usando o motor C: {e}")
+    return pd.read_csv(io.StringIO(texto), **leitura)
+
+# dd/mm/aaaa com formato explícito; só o que não casar cai na inferência lenta
+def _converter_data(serie):
+    datas = pd.to_datetime(serie, format=FORMATO_DATA, errors="coerce")
+    resto = datas.isna() & serie.notna()
+    if resto.any():
+        datas[resto] = pd.to_datetime(serie[resto], errors="coerce", dayfirst=True)
+    return datas
+
+# "HH:MM:SS" -> minutos (float), sem passar por Timedelta
+def _converter_duracao(serie):
+    texto = serie.astype("string")
+    partes = texto.str.extract(_DURACAO).apply(pd.to_numeric, errors="coerce")
+    minutos = partes[0] * 60 + partes[1] + partes[2] / 60
+    resto = minutos.isna() & serie.notna()
+    if resto.any():
+        minutos[resto] = pd.to_timedelta(texto[resto], errors="coerce").dt.total_seconds() / 60
+    return minutos.astype(float)
+
+# Decodifica só os valores distintos e espalha o resultado pelos códigos
+def _decodificar_booleano(serie):
+    if serie.dtype == bool:
+        return serie
+    codigos, valores = pd.factorize(serie)
+    verdadeiros = pd.Index(valores).astype(str).str.strip().str.upper().isin(VERDADEIROS)
+    verdadeiros = np.append(verdadeiros, False)  # código -1 (vazio) -> False
+    return pd.Series(verdadeiros[codigos], index=serie.index)
+
+# ============================= Snapshots locais =============================
+# Cada planilha baixada é gravada em disco (Parquet ou Feather, uma por gid)
+# e reaproveitada enquanto estiver dentro do TTL, evitando um novo download
+# e um novo parse do CSV a cada chamada.
+SNAPSHOT_DIR = os.environ.get(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+)
+SNAPSHOT_TTL = timedelta(minutes=float(os.environ.get("SNAPSHOT_TTL_MIN", 10)))
+SNAPSHOT_FORMATO = os.environ.get("SNAPSHOT_FORMATO", "parquet")  # "parquet" ou "feather"
+# Incrementar quando um tratamento mudar as colunas geradas: snapshots de
+# versões anteriores deixam de ser aproveitados
+VERSAO_TRATAMENTOS = 2
+_META_SNAPSHOTS = os.path.join(SNAPSHOT_DIR, "snapshots.json")
+
+
+def _caminho_snapshot(chave):
+    return os.path.join(SNAPSHOT_DIR, f"{chave}.{SNAPSHOT_FORMATO}")
+
+def _ler_meta():
+    try:
+        with open(_META_SNAPSHOTS, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _gravar_meta(meta):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    temporario = _META_SNAPSHOTS + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, _META_SNAPSHOTS)
+
+def _caminho_hashes(chave):
+    return os.path.join(SNAPSHOT_DIR, f"{chave}.hashes.npy")
+
+# O índice do frame é a posição da linha no CSV exportado; ele é gravado na
+# coluna "_linha" para que o modo incremental saiba qual linha virou qual registro.
+def _ler_snapshot(chave, ttl):
+    info = _ler_meta().get(chave)
+    caminho = _caminho_snapshot(chave)
+    if not info or info.get("formato") != SNAPSHOT_FORMATO or not os.path.exists(caminho):
+        return None
+    if info.get("tratamentos", 1) != VERSAO_TRATAMENTOS:
+        return None
+    if datetime.now() - datetime.fromisoformat(info["tirado_em"]) > ttl:
+        return None
+    try:
+        if SNAPSHOT_FORMATO == "feather":
+            df = pd.read_feather(caminho)
+        else:
+            df = pd.read_parquet(caminho)
+        return df.set_index("_linha").rename_axis(None)
+    except Exception as e:
+        print(f"⚠️ Snapshot {chave} ilegível, baixando novamente: {e}")
+        return None
+
+def _salvar_snapshot(chave, df, hashes=None):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    caminho = _caminho_snapshot(chave)
+    temporario = caminho + ".tmp"
+    try:
+        tabela = df.rename_axis("_linha").reset_index()
+        if SNAPSHOT_FORMATO == "feather":
+            tabela.to_feather(temporario)
+        else:
+            tabela.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+        if hashes is not None:
+            with open(_caminho_hashes(chave) + ".tmp", "wb") as f:
+                np.save(f, hashes)
+            os.replace(_caminho_hashes(chave) + ".tmp", _caminho_hashes(chave))
+    except Exception as e:
+        # Sem pyarrow (ou coluna não serializável) segue sem cache
+        print(f"⚠️ Não foi possível gravar o snapshot {chave}: {e}")
+        return
+
+    meta = _ler_meta()
+    meta[chave] = {
+        "tirado_em": datetime.now().isoformat(timespec="seconds"),
+        "linhas": int(len(df)),
+        "formato": SNAPSHOT_FORMATO,
+        "incremental": hashes is not None,
+        "tratamentos": VERSAO_TRATAMENTOS,
+    }
+    _gravar_meta(meta)
+
+# {chave: {"tirado_em", "linhas", "formato", "incremental", "tratamentos"}} de cada snapshot gravado
+def snapshots_info():
+    return _ler_meta()
+
+# Há quanto tempo o snapshot da planilha `nome` foi tirado (None se não existe)
+def idade_snapshot(nome):
+    info = _ler_meta().get(_chave(nome))
+    if not info:
+        return None
+    return datetime.now() - datetime.fromisoformat(info["tirado_em"])
+
+# Invalida os snapshots das planilhas informadas (ou todas) para a próxima leitura baixar de novo
+def forcar_atualizacao(*nomes):
+    meta = _ler_meta()
+    for chave in ([_chave(n) for n in nomes] if nomes else list(meta)):
+        meta.pop(chave, None)
+    _gravar_meta(meta)
+
+
+# ============================= Tratamentos =============================
+def _tratar_cte(df):
+    df["Data"] = _converter_data(df["Data"])
     df["Quantidade de CTe"] = pd.to_numeric(df["Quantidade de CTe"], errors="coerce").astype("Int64")
     df = df.dropna(subset=["Data"])
     return df
 
-def conhecimentos ():
-    df = pd.read_csv(
-        "https://docs.google.com/spreadsheets/d/1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0/export?format=csv&gid=2004182381", 
-        dtype={
-            "REMETENTE": str,
-            "DESTINATARIO":str,
-        }
-    )
+def _tratar_conhecimentos(df):
     return df
 
-def ocorrencias():
-    df = pd.read_csv(
-        "https://docs.google.com/spreadsheets/d/1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0/export?format=csv&gid=0",
-    )
-    
-    df['Data'] = pd.to_datetime(df["Data"], errors="coerce", dayfirst=True)
+def _tratar_ocorrencias(df):
+    df['Data'] = _converter_data(df["Data"])
     df["Turno"] = df["Turno"].astype(str).str.strip()
     df = df.dropna(subset=["Data"])
     status_map = {
@@ -35,11 +222,8 @@ def ocorrencias():
 
     return df
 
-def desacordos():
-    df = pd.read_csv(
-        "https://docs.google.com/spreadsheets/d/1d6dnzakl3ZXuQTyMzRAjugcL9g0mmw8r985PJj-IKA0/export?format=csv&gid=1041434519",
-    )
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce", dayfirst=True)
+def _tratar_desacordos(df):
+    df["Data"] = _converter_data(df["Data"])
     df = df.dropna(subset=["Data"])
     
     status_map = {
@@ -50,24 +234,314 @@ def desacordos():
     df["Pendências"] = df["Pendências"].apply(lambda x: status_map.get(x, x))
     return df
 
-def fechamento():
-    df = pd.read_csv(
-        "https://docs.google.com/spreadsheets/d/1EScFjmlwCXi212yQVz6b7sj-d7XniwlkR1lldTAQkRk/export?format=csv&gid=0",
-        header=1 
-    )
-    
+def _tratar_fechamento(df):
     df = df.dropna(subset=["Placa"])
-    df = df.astype(str)
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce", dayfirst=True)
-    df['Total (min)'] = pd.to_timedelta(df['Total (min)'], errors='coerce').dt.total_seconds() / 60
-    df['CT-e emitido'] = df['CT-e emitido'].astype(str).str.upper().isin(['TRUE', 'VERDADEIRO', '1'])
-    df['Recepção de NFs'] = df['Recepção de NFs'].astype(str).str.upper().isin(['TRUE', 'VERDADEIRO', '1'])
-    df['Pedágio'] = df['Pedágio'].astype(str).str.upper().isin(['TRUE', 'VERDADEIRO', '1'])
+    df["Data"] = _converter_data(df["Data"])
+    df['Total (min)'] = _converter_duracao(df['Total (min)'])
+    for coluna in ['CT-e emitido', 'Recepção de NFs', 'Pedágio']:
+        df[coluna] = _decodificar_booleano(df[coluna])
     return df
 
-def ocorrenciasRecebimento():
-    df = pd.read_csv(
-        "https://docs.google.com/spreadsheets/d/1588Wscg2jZBDM6kQKsfjEeLeA8p3cU2qkpmHqhbw4mk/export?format=csv&gid=514085568",
-        header=0
+# Coluna com o HTML do link das evidências, pronta para o relatório
+COLUNA_ANEXO = "Anexo"
+
+def _tratar_recebimento(df):
+    # A última coluna da planilha traz o link das evidências
+    links = df[df.columns[-1]].astype("string")
+    eh_link = links.str.startswith("http", na=False)
+    df[COLUNA_ANEXO] = df[df.columns[-1]].where(
+        ~eh_link, '<a href="' + links + '" target="_blank">Abrir Anexo 📎</a>'
     )
+    # "Data" parseada: o serviço mantém o frame ordenado por ela e o
+    # relatório pega o dia com filtrar_periodo em vez de comparar texto
+    df["Data"] = _converter_data(df["Data da ocorrência"])
     return df
+
+TRATAMENTOS = {
+    "cte": _tratar_cte,
+    "conhecimentos": _tratar_conhecimentos,
+    "ocorrencias": _tratar_ocorrencias,
+    "desacordos": _tratar_desacordos,
+    "fechamento": _tratar_fechamento,
+    "recebimento": _tratar_recebimento,
+}
+
+# ============================= Schemas =============================
+# Tipos compactos aplicados depois do tratamento: colunas de baixa
+# cardinalidade viram "category", contagens viram inteiro anulável e flags
+# viram bool. Colunas ausentes na planilha são ignoradas.
+SCHEMAS = {
+    "cte": {
+        "Responsável": "category",
+        "Turno": "category",
+        "Quantidade de CTe": "Int64",
+    },
+    "ocorrencias": {
+        "Turno": "category",
+        "Status": "category",
+        "Tipo de Erro": "category",
+        "Responsável correção": "category",
+    },
+    "desacordos": {
+        "Setor Responsavel": "category",
+        "Pendências": "category",
+        "MOTIVO DA SUBSTITUIÇÃO": "category",
+        "Descontar": "category",
+        "Expedidor do Erro": "category",
+    },
+    "fechamento": {
+        "Colaborador": "category",
+        "Tipo": "category",
+        "Destino": "category",
+        "Placa": "category",
+        "Turno": "category",
+        "QTD de CT-e": "Int64",
+        "CT-e emitido": "bool",
+        "Recepção de NFs": "bool",
+        "Pedágio": "bool",
+    },
+    "recebimento": {
+        "Placa do veículo": "category",
+        "Setor responsável": "category",
+    },
+}
+
+# {nome: {"antes": bytes, "depois": bytes}} da última carga completa de cada planilha
+MEMORIA = {}
+
+def _converter(serie, tipo):
+    if tipo == "category":
+        # Categorias sempre como texto (o CSV pode misturar números e strings)
+        return serie.where(serie.isna(), serie.astype(str)).astype("category")
+    if tipo == "Int64":
+        numeros = pd.to_numeric(serie, errors="coerce")
+        # Valores fracionados não cabem em inteiro: mantém como Float64
+        if (numeros.dropna() % 1 != 0).any():
+            return numeros.astype("Float64")
+        return numeros.astype("Int64")
+    if tipo == "datetime":
+        return _converter_data(serie)
+    return serie.astype(tipo)
+
+def _aplicar_schema(nome, df):
+    for coluna, tipo in SCHEMAS.get(nome, {}).items():
+        if coluna in df.columns and str(df[coluna].dtype) != tipo:
+            df[coluna] = _converter(df[coluna], tipo)
+    return df
+
+# Categorias da base e da parte nova precisam coincidir para o concat não virar object
+def _alinhar_categorias(base, parte):
+    for coluna in base.columns:
+        if isinstance(base[coluna].dtype, pd.CategoricalDtype) and isinstance(parte[coluna].dtype, pd.CategoricalDtype):
+            novas = parte[coluna].cat.categories.difference(base[coluna].cat.categories)
+            if len(novas):
+                base[coluna] = base[coluna].cat.add_categories(novas)
+            parte[coluna] = parte[coluna].cat.set_categories(base[coluna].cat.categories)
+    return base, parte
+
+def _tratar_com_schema(nome, df):
+    df = TRATAMENTOS[nome](df)
+    antes = int(df.memory_usage(deep=True).sum())
+    df = _aplicar_schema(nome, df.copy())
+    MEMORIA[nome] = {"antes": antes, "depois": int(df.memory_usage(deep=True).sum())}
+    return df
+
+# Memória (MB) de cada frame antes e depois dos schemas
+def relatorio_memoria():
+    linhas = [
+        {
+            "Planilha": nome,
+            "Antes (MB)": round(uso["antes"] / 1024 ** 2, 2),
+            "Depois (MB)": round(uso["depois"] / 1024 ** 2, 2),
+            "Redução": f"{uso['antes'] / uso['depois']:.1f}x" if uso["depois"] else "-",
+        }
+        for nome, uso in MEMORIA.items()
+    ]
+    return pd.DataFrame(linhas, columns=["Planilha", "Antes (MB)", "Depois (MB)", "Redução"])
+
+# ============================= Ingestão incremental =============================
+# As planilhas marcadas com "incremental" são logs diários que só crescem.
+# Guardamos o hash de cada linha do CSV já processado; no próximo download
+# só as linhas novas ou alteradas passam pelo parse e pelo tratamento, e o
+# resto do histórico vem do snapshot. Se o arquivo mudou demais (linhas
+# apagadas no meio, reordenação) ou os tipos divergirem, refaz tudo.
+LIMITE_INCREMENTAL = 0.5  # acima dessa fração de linhas alteradas, parse completo
+
+def _separar_linhas(nome, texto):
+    linhas = texto.split("\n")
+    if linhas and linhas[-1] == "":
+        linhas.pop()
+    n_cabecalho = PLANILHAS[nome].get("leitura", {}).get("header", 0) + 1
+    return linhas[:n_cabecalho], linhas[n_cabecalho:]
+
+def _ler_base_incremental(chave):
+    if not _ler_meta().get(chave, {}).get("incremental"):
+        return None, None
+    df = _ler_snapshot(chave, timedelta.max)
+    try:
+        hashes = np.load(_caminho_hashes(chave))
+    except (OSError, ValueError):
+        return None, None
+    return df, hashes
+
+def _processar_incremental(nome, cabecalho, corpo, hashes):
+    base, hashes_base = _ler_base_incremental(_chave(nome))
+    if base is None:
+        return None
+
+    comum = min(len(hashes_base), len(hashes))
+    alteradas = np.flatnonzero(hashes[:comum] != hashes_base[:comum])
+    alvo = np.concatenate([alteradas, np.arange(comum, len(hashes))])
+    if len(alvo) > LIMITE_INCREMENTAL * max(len(corpo), 1):
+        return None
+
+    mantidas = base[~base.index.isin(alteradas) & (base.index < len(hashes))]
+    if not len(alvo):
+        return mantidas
+
+    # Com poucas linhas o parser adivinharia outro tipo (CNPJ só com dígitos
+    # virando int e perdendo zeros à esquerda): colunas de texto na base são
+    # lidas como texto também na parte. Colunas object com outros valores
+    # (datetime.time/date que o pyarrow infere) ficam com a inferência
+    valores_base = {c: _tipo_valores(base[c]) for c in base.columns if base[c].dtype == object}
+    nomes_csv = next(csv.reader([cabecalho[-1]])) if cabecalho else []
+    como_texto = {c: str for c in nomes_csv if valores_base.get(c) == "string"}
+    parte = _ler_csv("\n".join(cabecalho + [corpo[i] for i in alvo]), nome, dtype=como_texto)
+    if len(parte) != len(alvo):
+        return None
+    parte.index = alvo
+    # Poucas linhas novas costumam trazer colunas inteiras vazias: mantém o tipo da base
+    for coluna in parte.columns.intersection(base.columns):
+        if parte[coluna].isna().all() and base[coluna].dtype.kind in "fO":
+            parte[coluna] = parte[coluna].astype(base[coluna].dtype)
+    parte = _aplicar_schema(nome, TRATAMENTOS[nome](parte))
+    if not base.empty and not _tipos_compativeis(base, parte, valores_base):
+        return None
+    mantidas, parte = _alinhar_categorias(mantidas.copy(), parte)
+
+    return pd.concat([mantidas, parte]).sort_index()
+
+# Tipo dos valores de uma coluna object ("string", "time", "date", "mixed"...)
+def _tipo_valores(serie):
+    return pd.api.types.infer_dtype(serie, skipna=True)
+
+# Mesmas colunas e, coluna a coluna, o mesmo tipo. Em colunas object os
+# valores dos dois lados também precisam ser do mesmo tipo (`valores_base`,
+# de _tipo_valores): texto com datetime.time passaria pelo concat mas não
+# pela gravação do parquet
+def _tipos_compativeis(base, parte, valores_base):
+    if list(parte.columns) != list(base.columns):
+        return False
+    for coluna in base.columns:
+        tipo_base, tipo_parte = base[coluna].dtype, parte[coluna].dtype
+        if isinstance(tipo_base, pd.CategoricalDtype):
+            if not isinstance(tipo_parte, pd.CategoricalDtype):
+                return False
+        elif tipo_base != tipo_parte:
+            return False
+        elif tipo_base == object:
+            na_base, na_parte = valores_base[coluna], _tipo_valores(parte[coluna])
+            if "empty" in (na_base, na_parte):
+                continue
+            if na_base != na_parte or na_base.startswith("mixed"):
+                return False
+    return True
+
+# Converte o CSV baixado no frame tratado da planilha `nome` e grava o snapshot
+def _processar(nome, texto, incremental=True):
+    if not PLANILHAS[nome].get("incremental"):
+        df = _tratar_com_schema(nome, _ler_csv(texto, nome))
+        _salvar_snapshot(_chave(nome), df)
+        return df
+
+    cabecalho, corpo = _separar_linhas(nome, texto)
+    hashes = pd.util.hash_array(np.asarray(corpo, dtype=object))
+
+    df = _processar_incremental(nome, cabecalho, corpo, hashes) if incremental else None
+    if df is None:
+        bruto = _ler_csv(texto, nome)
+        # Campos com quebra de linha ou linhas em branco desalinham linha x registro
+        if len(bruto) != len(corpo):
+            hashes = None
+        df = _tratar_com_schema(nome, bruto)
+
+    _salvar_snapshot(_chave(nome), df, hashes)
+    return df
+
+# ============================= Loaders =============================
+def conectData (forcar=False, ttl=None):
+    return carregar_planilhas(["cte"], forcar=forcar, ttl=ttl)["cte"]
+
+def conhecimentos (forcar=False, ttl=None):
+    return carregar_planilhas(["conhecimentos"], forcar=forcar, ttl=ttl)["conhecimentos"]
+
+def ocorrencias(forcar=False, ttl=None):
+    return carregar_planilhas(["ocorrencias"], forcar=forcar, ttl=ttl)["ocorrencias"]
+
+def desacordos(forcar=False, ttl=None):
+    return carregar_planilhas(["desacordos"], forcar=forcar, ttl=ttl)["desacordos"]
+
+def fechamento(forcar=False, ttl=None):
+    return carregar_planilhas(["fechamento"], forcar=forcar, ttl=ttl)["fechamento"]
+
+def ocorrenciasRecebimento(forcar=False, ttl=None):
+    return carregar_planilhas(["recebimento"], forcar=forcar, ttl=ttl)["recebimento"]
+
+# ============================= Carga em lote =============================
+# Baixa várias planilhas ao mesmo tempo num único cliente HTTP (pool de
+# conexões), com timeout e novas tentativas por planilha. O tempo total fica
+# próximo ao da planilha mais lenta em vez da soma de todas.
+async def _baixar_csv(client, nome, timeout, tentativas):
+    for tentativa in range(1, tentativas + 1):
+        try:
+            resposta = await client.get(_url(nome), timeout=timeout)
+            resposta.raise_for_status()
+            return resposta.text
+        except httpx.HTTPError:
+            if tentativa == tentativas:
+                raise
+            await asyncio.sleep(0.5 * 2 ** (tentativa - 1))
+
+async def _baixar_varios(nomes, timeouts, tentativas):
+    limites = httpx.Limits(max_connections=max(len(nomes), 1), max_keepalive_connections=max(len(nomes), 1))
+    async with httpx.AsyncClient(follow_redirects=True, limits=limites) as client:
+        tarefas = [_baixar_csv(client, nome, timeouts[nome], tentativas) for nome in nomes]
+        return await asyncio.gather(*tarefas, return_exceptions=True)
+
+# Retorna {nome: DataFrame já tratado} para as planilhas pedidas (todas por padrão).
+# `timeout` pode ser um número (segundos) ou um dict {nome: segundos}.
+# forcar=True ignora os snapshots e refaz o parse completo. Se `falhas` for
+# uma lista, recebe os nomes servidos do snapshot anterior por falha no download.
+def carregar_planilhas(nomes=None, forcar=False, ttl=None, timeout=20, tentativas=3, falhas=None):
+    nomes = list(nomes or PLANILHAS)
+    dados = {}
+
+    if not forcar:
+        for nome in nomes:
+            df = _ler_snapshot(_chave(nome), ttl or SNAPSHOT_TTL)
+            if df is not None:
+                dados[nome] = df
+
+    faltando = [nome for nome in nomes if nome not in dados]
+    if faltando:
+        timeouts = {
+            nome: timeout.get(nome, 20) if isinstance(timeout, dict) else timeout
+            for nome in faltando
+        }
+        textos = asyncio.run(_baixar_varios(faltando, timeouts, tentativas))
+
+        for nome, texto in zip(faltando, textos):
+            if isinstance(texto, Exception):
+                # Sem rede: usa o último snapshot, mesmo vencido, se existir
+                antigo = _ler_snapshot(_chave(nome), timedelta.max)
+                if antigo is None:
+                    raise texto
+                print(f"⚠️ Falha ao baixar {nome}, usando snapshot anterior: {texto}")
+                dados[nome] = antigo
+                if falhas is not None:
+                    falhas.append(nome)
+                continue
+
+            dados[nome] = _processar(nome, texto, incremental=not forcar)
+
+    return {nome: dados[nome] for nome in nomes}
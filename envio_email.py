@@ -0,0 +1,142 @@
+import os
+import smtplib
+import threading
+import time
+
+# ============================= Transporte SMTP =============================
+# Mantém uma sessão SMTP autenticada aberta e reaproveitada entre envios, em
+# vez de refazer conexão + STARTTLS + login a cada mensagem. Se o servidor
+# derrubar a sessão (timeout de inatividade, reinício), o NOOP antes do uso
+# percebe e reconecta sem o chamador perceber. Falhas ao abrir a sessão
+# (conexão, STARTTLS, login) são repetidas aqui até SMTP_TENTATIVAS vezes,
+# com espera crescente: nada foi enviado ainda. Falha no envio não é repetida.
+#
+# Modo de teste local: SMTP_LOCAL=1 desliga STARTTLS e login, para usar um
+# servidor de captura, por exemplo:
+#   python -m aiosmtpd -n -l localhost:8025
+#   SMTP_LOCAL=1 SMTP_HOST=localhost SMTP_PORT=8025 streamlit run Hello.py
+SMTP_LOCAL = os.environ.get("SMTP_LOCAL", "0") == "1"
+SMTP_HOST = os.environ.get("SMTP_HOST", "localhost" if SMTP_LOCAL else "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 8025 if SMTP_LOCAL else 587))
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", 30))
+# Depois desse tempo parado, confere a sessão com NOOP antes de usar
+SMTP_OCIOSO = float(os.environ.get("SMTP_OCIOSO_S", 15))
+SMTP_TENTATIVAS = int(os.environ.get("SMTP_TENTATIVAS", 3))
+SMTP_ESPERA = float(os.environ.get("SMTP_ESPERA_S", 2))
+
+_FALHAS_CONEXAO = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class TransporteSMTP:
+    def __init__(self, remetente, senha, host=SMTP_HOST, port=SMTP_PORT, local=SMTP_LOCAL):
+        self.remetente = remetente
+        self.senha = senha
+        self.host = host
+        self.port = port
+        self.local = local
+        self._smtp = None
+        self._usado_em = 0.0
+        self._lock = threading.Lock()
+        self.estatisticas = {"conexoes": 0, "enviadas": 0, "reconexoes": 0}
+
+    def _conectar(self):
+        self._fechar_sessao()
+        for tentativa in range(1, SMTP_TENTATIVAS + 1):
+            try:
+                self._smtp = self._abrir()
+                break
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except OSError as e:  # inclui SMTPException e falhas de socket
+                if tentativa == SMTP_TENTATIVAS:
+                    raise
+                print(f"⚠️ SMTP indisponível (tentativa {tentativa}/{SMTP_TENTATIVAS}): {e}")
+                time.sleep(SMTP_ESPERA * 2 ** (tentativa - 1))
+        self.estatisticas["conexoes"] += 1
+
+    def _abrir(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if not self.local:
+                smtp.starttls()
+                smtp.login(self.remetente, self.senha)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def _fechar_sessao(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        finally:
+            self._smtp.close()
+            self._smtp = None
+
+    # Sessão pronta para uso: abre se não houver e testa com NOOP se ficou
+    # ociosa. Só aqui a sessão é refeita sem o chamador ver: nada foi enviado
+    def _sessao(self):
+        if self._smtp is not None and time.monotonic() - self._usado_em > SMTP_OCIOSO:
+            try:
+                ok = self._smtp.noop()[0] == 250
+            except (smtplib.SMTPException, *_FALHAS_CONEXAO):
+                ok = False
+            if not ok:
+                self._fechar_sessao()
+                self.estatisticas["reconexoes"] += 1
+        if self._smtp is None:
+            self._conectar()
+        return self._smtp
+
+    # Falha durante o envio não é repetida aqui: o servidor pode ter aceitado
+    # a mensagem antes de cair, e reenviar duplicaria o e-mail. A sessão, em
+    # estado incerto, é fechada e a próxima mensagem abre outra
+    def _enviar(self, msg):
+        smtp = self._sessao()
+        try:
+            smtp.send_message(msg)
+        except Exception:
+            self._fechar_sessao()
+            raise
+        self._usado_em = time.monotonic()
+        self.estatisticas["enviadas"] += 1
+
+    def enviar(self, msg):
+        with self._lock:
+            self._enviar(msg)
+
+    # Entrega várias mensagens na mesma sessão. Uma falha não interrompe o
+    # lote; devolve a lista de erros (None para as que foram entregues)
+    def enviar_lote(self, mensagens):
+        erros = []
+        with self._lock:
+            for msg in mensagens:
+                try:
+                    self._enviar(msg)
+                    erros.append(None)
+                except Exception as e:
+                    erros.append(e)
+        return erros
+
+    def fechar(self):
+        with self._lock:
+            self._fechar_sessao()
+
+
+_transportes = {}
+_transportes_lock = threading.Lock()
+
+
+# Um transporte por conta/servidor, compartilhado pelo processo inteiro
+def transporte_smtp(remetente, senha, host=SMTP_HOST, port=SMTP_PORT):
+    chave = (host, port, remetente)
+    with _transportes_lock:
+        transporte = _transportes.get(chave)
+        if transporte is None or transporte.senha != senha:
+            if transporte is not None:
+                transporte.fechar()
+            transporte = _transportes[chave] = TransporteSMTP(remetente, senha, host, port)
+        return transporte
@@ -0,0 +1,133 @@
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import requests
+
+# ============================= Geocodificação =============================
+# Endereço -> (lat, lon) pelo Nominatim, com cache persistente em SQLite pela
+# forma normalizada do endereço. Resultados positivos valem GEOCODE_TTL_DIAS;
+# endereços que o Nominatim não encontrou também são guardados (por menos
+# tempo) para não serem consultados de novo a cada rerun. Falhas de rede
+# não entram no cache. As consultas respeitam o limite de 1 req/s do
+# Nominatim. Para pré-aquecer com a lista de clientes frequentes:
+#   python geocodificacao.py clientes.txt     # um endereço por linha
+CARGAS_CACHE_DIR = os.environ.get(
+    "CARGAS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cargas")
+)
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODE_TTL = timedelta(days=float(os.environ.get("GEOCODE_TTL_DIAS", 90)))
+GEOCODE_TTL_NEGATIVO = timedelta(hours=float(os.environ.get("GEOCODE_TTL_NEGATIVO_H", 24)))
+GEOCODE_INTERVALO_S = float(os.environ.get("GEOCODE_INTERVALO_S", 1.0))
+_BANCO = os.path.join(CARGAS_CACHE_DIR, "geocode.sqlite")
+_HEADERS = {"User-Agent": "MeuApp/1.0 (email@exemplo.com)"}
+
+_ultima_consulta = 0.0
+_consulta_lock = threading.Lock()
+
+
+def normalizar(endereco):
+    texto = unicodedata.normalize("NFKD", endereco or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r"\s*,\s*", ", ", texto)
+    return re.sub(r"\s+", " ", texto).strip(" ,")
+
+
+@contextmanager
+def _conectar():
+    os.makedirs(CARGAS_CACHE_DIR, exist_ok=True)
+    conexao = sqlite3.connect(_BANCO, timeout=10)
+    try:
+        with conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " endereco TEXT PRIMARY KEY, lat REAL, lon REAL, consultado_em TEXT NOT NULL)"
+            )
+            yield conexao
+    finally:
+        conexao.close()
+
+
+# (encontrado no cache, coordenadas ou None)
+def _ler_cache(chave):
+    with _conectar() as conexao:
+        linha = conexao.execute(
+            "SELECT lat, lon, consultado_em FROM geocode WHERE endereco = ?", (chave,)
+        ).fetchone()
+    if linha is None:
+        return False, None
+    lat, lon, consultado_em = linha
+    ttl = GEOCODE_TTL if lat is not None else GEOCODE_TTL_NEGATIVO
+    if datetime.now() - datetime.fromisoformat(consultado_em) > ttl:
+        return False, None
+    return True, (lat, lon) if lat is not None else None
+
+
+def _gravar_cache(chave, coords):
+    lat, lon = coords if coords else (None, None)
+    with _conectar() as conexao:
+        conexao.execute(
+            "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+            (chave, lat, lon, datetime.now().isoformat(timespec="seconds")),
+        )
+
+
+# Consulta o Nominatim; levanta exceção em falha de rede/HTTP e devolve
+# None quando o endereço não foi encontrado
+def _consultar(endereco):
+    global _ultima_consulta
+    with _consulta_lock:
+        espera = GEOCODE_INTERVALO_S - (time.monotonic() - _ultima_consulta)
+        if espera > 0:
+            time.sleep(espera)
+        try:
+            resp = requests.get(
+                NOMINATIM_URL, params={"q": endereco, "format": "json"}, headers=_HEADERS, timeout=20
+            )
+        finally:
+            _ultima_consulta = time.monotonic()
+    resp.raise_for_status()
+    dados = resp.json()
+    if not dados:
+        return None
+    return float(dados[0]["lat"]), float(dados[0]["lon"])
+
+
+def geocodificar(endereco):
+    chave = normalizar(endereco)
+    if not chave:
+        return None
+    encontrado, coords = _ler_cache(chave)
+    if encontrado:
+        return coords
+    try:
+        coords = _consultar(endereco)
+    except (requests.RequestException, ValueError) as e:
+        print(f"⚠️ Erro ao geocodificar '{endereco}': {e}")
+        return None
+    _gravar_cache(chave, coords)
+    return coords
+
+
+# Geocodifica os endereços que ainda não estão no cache (ou venceram);
+# devolve quantos precisaram ir à rede
+def pre_aquecer(enderecos):
+    consultados = 0
+    for endereco in dict.fromkeys(normalizar(e) for e in enderecos if e and e.strip()):
+        if not _ler_cache(endereco)[0]:
+            geocodificar(endereco)
+            consultados += 1
+    return consultados
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8") as f:
+        total = pre_aquecer(f)
+    print(f"✅ {total} endereços consultados; demais já estavam no cache.")
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# ============================= Cache de figuras =============================
+# Guarda as figuras Plotly prontas pela impressão digital dos dados agregados
+# + especificação do gráfico. Dados iguais (mesmo vindos de filtros
+# diferentes, ou de páginas sem memo de figura como o Dashboard) devolvem o
+# mesmo objeto, sem refazer o plotly.express, os update_layout/traces nem a
+# validação de um from_json. A serialização para o navegador continua a
+# cargo do st.plotly_chart. As figuras são só lidas depois de prontas, então
+# podem ser compartilhadas entre sessões. Limitado em número de figuras,
+# descartando as menos usadas.
+# O plotly só é importado na primeira figura, não no import da página.
+GRAFICOS_MAX = int(os.environ.get("GRAFICOS_MAX", 256))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+estatisticas = {"acertos": 0, "falhas": 0}
+
+def _impressao_digital(tipo, dados, spec):
+    h = hashlib.sha1(tipo.encode())
+    h.update(repr(list(dados.columns)).encode())
+    h.update(repr(list(dados.dtypes.astype(str))).encode())
+    h.update(pd.util.hash_pandas_object(dados, index=True).values.tobytes())
+    h.update(repr(sorted(spec.items())).encode())
+    return h.hexdigest()
+
+def _construir(tipo, dados, layout, traces, spec):
+    import plotly.express as px
+
+    fig = getattr(px, tipo)(dados, **spec)
+    if layout:
+        fig.update_layout(**layout)
+    if traces:
+        fig.update_traces(**traces)
+    return fig
+
+# grafico("bar", dados, x=..., y=..., layout={...}, traces={...}) -> go.Figure
+def grafico(tipo, dados, layout=None, traces=None, **spec):
+    chave = _impressao_digital(tipo, dados, {**spec, "_layout": layout, "_traces": traces})
+
+    with _lock:
+        fig = _cache.get(chave)
+        if fig is not None:
+            _cache.move_to_end(chave)
+            estatisticas["acertos"] += 1
+            return fig
+
+    fig = _construir(tipo, dados, layout, traces, spec)
+    with _lock:
+        estatisticas["falhas"] += 1
+        _cache[chave] = fig
+        _cache.move_to_end(chave)
+        while len(_cache) > GRAFICOS_MAX:
+            _cache.popitem(last=False)
+    return fig
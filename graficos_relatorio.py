@@ -0,0 +1,151 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# ============================= Gráficos do relatório =============================
+# Renderização com a API orientada a objetos do Agg (sem o estado global do
+# pyplot), segura para várias sessões ao mesmo tempo. Cada gráfico é descrito
+# por um pedido (nome, argumentos simples); os pedidos rodam em processos
+# separados e os bytes ficam em cache pela impressão digital do pedido.
+# Este módulo não carrega dados: os processos filhos o importam sem custo.
+FORMATO_GRAFICO = os.environ.get("FORMATO_GRAFICO", "png")  # "png" ou "svg"
+DPI_GRAFICO = int(os.environ.get("DPI_GRAFICO", 100))
+PROCESSOS_GRAFICO = int(os.environ.get("PROCESSOS_GRAFICO", 2))
+CACHE_GRAFICOS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _cores(n):
+    return matplotlib.colormaps["tab20"].resampled(n).colors
+
+def _salvar(fig, formato, dpi):
+    FigureCanvasAgg(fig)
+    buf = io.BytesIO()
+    if formato == "png":
+        fig.savefig(buf, format="png", bbox_inches="tight", dpi=dpi,
+                    metadata={"Software": None}, pil_kwargs={"optimize": True})
+    else:
+        fig.savefig(buf, format=formato, bbox_inches="tight", metadata={"Creator": None})
+    return buf.getvalue()
+
+def aviso(figsize, texto, formato, dpi):
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.text(0.5, 0.5, texto, ha="center", va="center", fontsize=11)
+    ax.axis("off")
+    return _salvar(fig, formato, dpi)
+
+def pizza_cte(rotulos, valores, formato, dpi):
+    total = sum(valores)
+    maior = max(valores)
+    fig = Figure(figsize=(6, 6))
+    ax = fig.subplots()
+    ax.pie(
+        valores,
+        labels=rotulos,
+        autopct=lambda p: f"{p:.1f}%\n{p * total / 100:.0f} CT-e",
+        startangle=90,
+        colors=_cores(len(valores)),
+        explode=[0.1 if v == maior else 0 for v in valores],
+        textprops={"fontsize": 9},
+    )
+    ax.set_title("Baixa de CT-e por Colaborador", fontsize=12)
+    return _salvar(fig, formato, dpi)
+
+def barras_tempo(rotulos, horas, formato, dpi):
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    ax.bar(rotulos, horas, color=_cores(len(horas)))
+    ax.set_title("Tempo Médio por Tipo de Operação (horas)", fontsize=12)
+    ax.set_ylabel("Horas")
+
+    for i, v in enumerate(horas):
+        h = int(v // 1)
+        minutos = int((v % 1) * 60)
+        ax.text(i, v, f"{h}h {minutos}m", ha="center", va="bottom", fontsize=9)
+    return _salvar(fig, formato, dpi)
+
+_GRAFICOS = {
+    "aviso": aviso,
+    "pizza_cte": pizza_cte,
+    "barras_tempo": barras_tempo,
+}
+
+def _renderizar(pedido):
+    nome, args, formato, dpi = pedido
+    return _GRAFICOS[nome](*args, formato, dpi)
+
+def _chave(pedido):
+    return hashlib.sha1(repr(pedido).encode()).hexdigest()
+
+# Um pool por processo, criado sob _pool_lock: sessões simultâneas não
+# abrem dois
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: o servidor do Streamlit tem várias threads, e um fork no meio
+            # delas pode herdar locks presos e travar o filho
+            _pool = ProcessPoolExecutor(
+                max_workers=PROCESSOS_GRAFICO, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+# Descarta o pool com falha; se outra thread já o trocou, mantém o novo
+def _descartar(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+# pedidos: lista de (nome, args) -> lista de bytes (PNG/SVG) na mesma ordem
+def renderizar(pedidos, formato=FORMATO_GRAFICO, dpi=DPI_GRAFICO):
+    pedidos = [(nome, tuple(args), formato, dpi) for nome, args in pedidos]
+    chaves = [_chave(p) for p in pedidos]
+
+    with _lock:
+        prontos = {c: _cache[c] for c in chaves if c in _cache}
+    faltando = [(c, p) for c, p in zip(chaves, pedidos) if c not in prontos]
+
+    if faltando:
+        pendentes = [p for _, p in faltando]
+        if PROCESSOS_GRAFICO > 0 and len(pendentes) > 1:
+            pool = _executor()
+            try:
+                resultados = list(pool.map(_renderizar, pendentes))
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                # RuntimeError: outra thread descartou este pool no meio do map
+                print(f"⚠️ Falha no pool de gráficos, renderizando no processo atual: {e}")
+                _descartar(pool)
+                resultados = [_renderizar(p) for p in pendentes]
+        else:
+            resultados = [_renderizar(p) for p in pendentes]
+
+        with _lock:
+            for (chave, _), dados in zip(faltando, resultados):
+                prontos[chave] = dados
+                _cache[chave] = dados
+            while len(_cache) > CACHE_GRAFICOS:
+                _cache.popitem(last=False)
+
+    with _lock:
+        for chave in chaves:
+            if chave in _cache:
+                _cache.move_to_end(chave)
+    return [prontos[c] for c in chaves]
@@ -0,0 +1,70 @@
+import pandas as pd
+
+# ============================= Métricas operacionais =============================
+# Uma única passada de groupby por (Tipo, Colaborador, Destino) gera uma
+# tabela pequena; todos os recortes usados pela página de Fechamento e pelo
+# relatório por e-mail saem dela, com o Tipo normalizado uma vez só.
+SEDE = "itapecerica da serra"  # destino comparado em minúsculas
+
+def _tabela_base(df):
+    qtd_cte = pd.to_numeric(df["QTD de CT-e"], errors="coerce").fillna(0)
+    tabela = (
+        df.assign(**{"QTD de CT-e": qtd_cte})
+        .groupby(["Tipo", "Colaborador", "Destino"], observed=True, dropna=False)
+        .agg(
+            linhas=("Placa", "size"),
+            placas=("Placa", "count"),
+            operacoes=("Total (min)", "count"),
+            minutos=("Total (min)", "sum"),
+            cte=("QTD de CT-e", "sum"),
+            pedagios=("Pedágio", "sum"),
+        )
+        .reset_index()
+    )
+    tabela["tipo"] = tabela["Tipo"].astype(str).str.lower()
+    return tabela
+
+def calcular_metricas(df):
+    if df is None or df.empty:
+        total = 0
+        tabela = pd.DataFrame(columns=[
+            "Tipo", "Colaborador", "Destino", "linhas", "placas",
+            "operacoes", "minutos", "cte", "pedagios", "tipo",
+        ])
+    else:
+        total = len(df)
+        tabela = _tabela_base(df)
+
+    por_tipo = tabela.groupby("Tipo", observed=True)[["operacoes", "minutos"]].sum()
+    lancamentos = tabela[tabela["tipo"] == "lançamento"]
+    pedagios = int(tabela["pedagios"].sum())
+
+    return {
+        "tabela": tabela,
+        "total": total,
+        "contagem": tabela.groupby("tipo")["linhas"].sum().astype(int),
+        "operacoes_por_tipo": por_tipo["operacoes"].sort_values(ascending=False),
+        "tempo_medio_por_tipo": (por_tipo["minutos"] / por_tipo["operacoes"]).dropna(),
+        "top_destinos": (
+            lancamentos.groupby("Destino", observed=True)["operacoes"]
+            .sum()
+            .sort_values(ascending=False)
+            .head(10)
+        ),
+        "viagens": int(lancamentos[lancamentos["Destino"].astype(str).str.lower() != SEDE]["linhas"].sum()),
+        "pedagios": pedagios,
+        "pedagio_pct": pedagios / total * 100 if total else 0.0,
+    }
+
+# Quantidade de linhas do tipo ("lançamento", "baixa", ...)
+def contagem(metricas, tipo):
+    return int(metricas["contagem"].get(tipo, 0))
+
+# Soma de `medida` ("placas", "cte", "minutos", ...) por colaborador para um tipo
+def por_colaborador(metricas, tipo, medida):
+    tabela = metricas["tabela"]
+    return (
+        tabela[tabela["tipo"] == tipo]
+        .groupby("Colaborador", observed=True)[medida]
+        .sum()
+    )
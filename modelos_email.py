@@ -0,0 +1,146 @@
+import copy
+import io
+import os
+import threading
+from email.mime.image import MIMEImage
+from string import Template
+
+# ============================= Modelos do e-mail =============================
+# O HTML do relatório é montado a partir de modelos compilados uma vez no
+# import (string.Template) em vez de f-strings crescendo com +=. As partes
+# que não mudam entre envios — folha de estilo e assinatura — são montadas
+# uma única vez e reaproveitadas em todas as mensagens.
+ASSINATURA = os.environ.get(
+    "ASSINATURA_EMAIL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "assinatura.png")
+)
+# Largura máxima da assinatura em pixels (é exibida com width="620"; o
+# dobro mantém a nitidez em telas de alta densidade). 0 desliga a redução
+ASSINATURA_LARGURA = int(os.environ.get("ASSINATURA_LARGURA", 1240))
+
+ESTILO = """
+    <style>
+        body { font-family: Arial, sans-serif; color: #333; }
+        ul { line-height: 1.6; }
+        .tabela-relatorio { border-collapse: collapse; width: 100%; margin-top: 10px; }
+        .tabela-relatorio th { background-color: #4CAF50; color: white; padding: 8px; text-align: left; }
+        .tabela-relatorio td { padding: 6px; border-bottom: 1px solid #ddd; }
+        .tabela-relatorio tr:nth-child(even) { background-color: #f2f2f2; }
+    </style>"""
+
+MODELO_VAZIO = Template("""<html>
+<body style="font-family: Arial; color: #333;">
+    <h2>📅 Relatório Diário - $data</h2>
+    <p>⚠️ Nenhum dado disponível para gerar o relatório de hoje.</p>
+</body>
+</html>""")
+
+MODELO_RELATORIO = Template("""<html>
+<head>$estilo
+</head>
+<body>
+    <h2>📅 Relatório Diário - $data</h2>
+    <p>Resumo das operações:</p>
+    <ul>
+        <li><b>Total de registros:</b> $total_registros</li>
+        <li><b>Lançamentos SP:</b> $total_lancamentos</li>
+        <li><b>Baixas:</b> $total_baixas</li>
+        <li><b>Abastecimentos:</b> $total_abastecimentos</li>
+        <li><b>Viagens:</b> $total_viagens</li>
+    </ul>
+
+    <h3> Quandidade de CT-e digitados </h3>
+    $cte_html
+
+    <h3>🚚 Viagens fechadas</h3>
+    $tabela_html
+
+    <h3>📈 Gráficos</h3>
+    $graficos_html
+    $ocorrencias_html
+    <br>
+    <p>Atenciosamente,</p>
+    <br>
+    <img src="cid:assinatura" alt="Assinatura" width="620"/>
+</body>
+</html>""")
+
+MODELO_GRAFICO = Template('<img src="cid:grafico$numero" width="600"/><br><br>')
+
+MODELO_OCORRENCIAS = Template("""
+    <h3>⚠️ Ocorrências</h3>
+    $tabela
+
+    <h3>📌 Observações</h3>
+    <p>$observacoes</p>
+""")
+
+SEM_GRAFICOS = "<p><i>⚠️ Nenhum gráfico foi gerado por falta de dados.</i></p>"
+
+
+def html_vazio(data):
+    return MODELO_VAZIO.substitute(data=data)
+
+
+def html_relatorio(data, totais, cte_html, tabela_html, n_graficos, ocorrencias_tabela=None, observacoes=None):
+    if n_graficos:
+        graficos_html = "".join(MODELO_GRAFICO.substitute(numero=i + 1) for i in range(n_graficos))
+    else:
+        graficos_html = SEM_GRAFICOS
+
+    ocorrencias_html = ""
+    if observacoes:
+        ocorrencias_html = MODELO_OCORRENCIAS.substitute(
+            tabela=ocorrencias_tabela,
+            observacoes=observacoes.replace("\n", "<br>"),
+        )
+
+    return MODELO_RELATORIO.substitute(
+        estilo=ESTILO,
+        data=data,
+        cte_html=cte_html,
+        tabela_html=tabela_html,
+        graficos_html=graficos_html,
+        ocorrencias_html=ocorrencias_html,
+        **totais,
+    )
+
+
+# ------------------------- Assinatura (parte fixa) -------------------------
+_assinatura = None
+_assinatura_lock = threading.Lock()
+
+
+# Reduz para a largura de exibição e recomprime o PNG; sem Pillow (ou com
+# erro de leitura) usa o arquivo como está
+def _reduzir_imagem(dados, largura):
+    try:
+        from PIL import Image
+    except ImportError:
+        return dados
+    try:
+        with Image.open(io.BytesIO(dados)) as img:
+            if largura and img.width > largura:
+                altura = round(img.height * largura / img.width)
+                img = img.resize((largura, altura), Image.LANCZOS)
+            saida = io.BytesIO()
+            img.save(saida, format="PNG", optimize=True)
+    except Exception:
+        return dados
+    reduzida = saida.getvalue()
+    return reduzida if len(reduzida) < len(dados) else dados
+
+
+# A parte MIME (já codificada em base64) é montada na primeira chamada;
+# cada mensagem recebe uma cópia profunda: uma cópia rasa dividiria a lista
+# _headers, e um cabeçalho mexido numa mensagem apareceria em todas
+def parte_assinatura():
+    global _assinatura
+    with _assinatura_lock:
+        if _assinatura is None:
+            with open(ASSINATURA, "rb") as f:
+                dados = _reduzir_imagem(f.read(), ASSINATURA_LARGURA)
+            parte = MIMEImage(dados, _subtype="png")
+            parte.add_header("Content-ID", "<assinatura>")
+            _assinatura = parte
+    return copy.deepcopy(_assinatura)
@@ -1,13 +1,91 @@
 import pandas as pd
 import streamlit as st 
-import plotly.express as px
-from database import conectData, ocorrencias, desacordos
+from graficos import grafico
+from componentes import tabela_paginada
+from servico import ativar_copy_on_write, obter_dados, servico_dados, filtrar_periodo
+from agregados import rollup_cte, rollup_ocorrencias, filtrar_rollup, somar_por
+
+# Visões rasas dos frames compartilhados (ver servico.py)
+ativar_copy_on_write()
 
 st.set_page_config(page_title="Dashboard", page_icon="📈", layout="wide")
 
-df = conectData()
-df_ocorrencias = ocorrencias()
-df_desacordos = desacordos()
+dados = obter_dados(["cte", "ocorrencias", "desacordos"])
+df = dados["cte"]
+df_ocorrencias = dados["ocorrencias"]
+df_desacordos = dados["desacordos"]
+
+
+# Filtros + agregados da aba Expedição; memorizado pelo serviço por
+# (versão dos dados, filtros), então voltar a uma combinação recente é imediato.
+def filtrar_expedicao(df, df_ocorrencias, data_inicio, data_fim, turno, colaborador, erro_sel):
+    # Métricas e gráficos saem dos rollups; o frame bruto de ocorrências
+    # só é filtrado para a tabela de registros e a contagem de clientes
+    filtro_turno = None if turno == "Todos os turnos" else turno
+    filtro_colab = None if colaborador == "Todos" else colaborador
+    filtro_erro = None if erro_sel == "Todos" else erro_sel
+    df_filtrado = filtrar_rollup(
+        servico_dados().derivado("cte", rollup_cte), data_inicio, data_fim,
+        {"Turno": filtro_turno, "Responsável": filtro_colab}
+    )
+    rollup_filtrado_ocorrencias = filtrar_rollup(
+        servico_dados().derivado("ocorrencias", rollup_ocorrencias), data_inicio, data_fim,
+        {"Turno": filtro_turno, "Responsável correção": filtro_colab, "Tipo de Erro": filtro_erro}
+    )
+    df_filtrado_ocorrencias = filtrar_periodo(df_ocorrencias, data_inicio, data_fim, ordenado=True)
+
+    # Aplicar filtro de turno
+    if filtro_turno is not None:
+        df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Turno"] == turno]
+
+    # Aplicar filtro de colaborador
+    if filtro_colab is not None:
+        df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Responsável correção"] == colaborador]
+
+    if filtro_erro is not None:
+        df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Tipo de Erro"] == erro_sel]
+
+    cte_por_responsavel = (
+        somar_por(df_filtrado, "Responsável", "Quantidade de CTe")
+        .reset_index()
+        .sort_values("Quantidade de CTe", ascending=False)
+    )
+    cte_hoje = df_filtrado[df_filtrado["Data"].dt.date == data_inicio.date()]["Quantidade de CTe"].sum()
+    coluna_cliente = "Cliente (CNPJ)" if "Cliente (CNPJ)" in df_filtrado_ocorrencias.columns else "Cliente"
+
+    df_tipo_erro = (
+        somar_por(rollup_filtrado_ocorrencias, "Tipo de Erro", "Qtde")
+        .sort_values(ascending=False)
+        .reset_index()
+    )
+    df_tipo_erro.columns = ["Tipo de Erro", "Qtde"]
+
+    return {
+        "vazio": df_filtrado.empty,
+        "cte_total": int(df_filtrado["Quantidade de CTe"].sum()),
+        "cte_hoje": int(cte_hoje) if not pd.isna(cte_hoje) else 0,
+        "top_responsaveis": cte_por_responsavel.head(3),
+        "top_dias": (
+            df_filtrado.groupby("Data")["Quantidade de CTe"]
+            .sum()
+            .nlargest(3)
+            .reset_index()
+            .sort_values("Quantidade de CTe", ascending=False)
+        ),
+        "resumo": cte_por_responsavel,
+        "ocorrencias": df_filtrado_ocorrencias,
+        "total_erros": int(rollup_filtrado_ocorrencias["Qtde"].sum()),
+        "erros_resolvidos": int(rollup_filtrado_ocorrencias[
+            rollup_filtrado_ocorrencias["Status"]
+                .astype(str)
+                .str.lower()
+                .str.contains("resolvido", na=False)
+        ]["Qtde"].sum()),
+        "clientes_afetados": df_filtrado_ocorrencias[coluna_cliente].nunique(),
+        "tipo_erro": df_tipo_erro,
+        "erros_turno": somar_por(rollup_filtrado_ocorrencias, "Turno", "Qtde").reset_index(),
+        "erros_dia": somar_por(rollup_filtrado_ocorrencias, "Data", "Qtde").reset_index(name="Erros"),
+    }
 
 
 def dashboard():
@@ -59,50 +137,33 @@ def dashboard():
         data_inicio, data_fim = pd.to_datetime(data), pd.to_datetime(data)
 
     if setor == "Expedição":
-        df_filtrado = df[(df["Data"] >= data_inicio) & (df["Data"] <= data_fim)]
-        df_filtrado_ocorrencias = df_ocorrencias[(df_ocorrencias["Data"] >= data_inicio) & (df_ocorrencias["Data"] <= data_fim)]
-
-        # Aplicar filtro de turno
-        if turno != "Todos os turnos":
-            df_filtrado = df_filtrado[df_filtrado["Turno"] == turno]
-            df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Turno"] == turno]
-
-        # Aplicar filtro de colaborador
-        if colaborador != "Todos":
-            df_filtrado = df_filtrado[df_filtrado["Responsável"] == colaborador]
-            df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Responsável correção"] == colaborador]
+        resultado = servico_dados().memo(
+            ["cte", "ocorrencias"], filtrar_expedicao,
+            data_inicio, data_fim, turno, colaborador, erro_sel
+        )
+        df_filtrado_ocorrencias = resultado["ocorrencias"]
 
-        if df_filtrado.empty:
+        if resultado["vazio"]:
             st.warning("Nenhum dado encontrado para os filtros selecionados.")
         else:
             # Métricas
             col1, col2, col3 = st.columns([3,1,3], vertical_alignment="center", gap="medium")
             with col2:
-                cte_total = int(df_filtrado["Quantidade de CTe"].sum())
-                cte_hoje = df_filtrado[df_filtrado["Data"].dt.date == data_inicio.date()]["Quantidade de CTe"].sum()
                 st.metric(
                     label="CTEs emitidos",
-                    value=cte_total,
-                    delta=int(cte_hoje) if not pd.isna(cte_hoje) else 0
+                    value=resultado["cte_total"],
+                    delta=resultado["cte_hoje"]
                 )
             with col3:
                 st.caption("🔝 Top 3 responsáveis por CTe emitido")
                 st.dataframe(
-                    df_filtrado.groupby("Responsável")["Quantidade de CTe"]
-                    .sum()
-                    .reset_index()
-                    .sort_values("Quantidade de CTe", ascending=False)
-                    .head(3),
+                    resultado["top_responsaveis"],
                     hide_index=True
                 )
             with col1:
                 st.caption("📅 Top 3 dias com mais CTe emitidos")
                 st.dataframe(
-                    df_filtrado.groupby("Data")["Quantidade de CTe"]
-                    .sum()
-                    .nlargest(3)
-                    .reset_index()
-                    .sort_values("Quantidade de CTe", ascending=False),
+                    resultado["top_dias"],
                     
                     hide_index=True,
                     column_config={
@@ -121,10 +182,9 @@ def dashboard():
                     }
                 )
             # Gráfico CTe por Responsável
-            resumo = df_filtrado.groupby("Responsável")["Quantidade de CTe"].sum().reset_index()
-            resumo = resumo.sort_values("Quantidade de CTe", ascending=False)
-            fig = px.bar(
-                resumo,
+            fig = grafico(
+                "bar",
+                resultado["resumo"],
                 x="Responsável",
                 y="Quantidade de CTe",
                 title=f"Quantidade de CTe por Responsável de {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')} - Turno: {turno} - Colaborador: {colaborador}",
@@ -134,51 +194,35 @@ def dashboard():
 
             # --- OCORRÊNCIAS ---
             st.title("🔢 Dashboard de Análise de Erros de CT-e")
-            if erro_sel != "Todos":
-                df_filtrado_ocorrencias = df_filtrado_ocorrencias[df_filtrado_ocorrencias["Tipo de Erro"] == erro_sel]
 
             col1, col2, col3 = st.columns(3)
-            col1.metric("Total de Erros", len(df_filtrado_ocorrencias))
-            col2.metric(
-                "Erros Resolvidos",
-                df_filtrado_ocorrencias[
-                    df_filtrado_ocorrencias["Status"]
-                        .astype(str)
-                        .str.lower()
-                        .str.contains("resolvido", na=False)
-                ].shape[0]  
-            )
-
-            coluna_cliente = "Cliente (CNPJ)" if "Cliente (CNPJ)" in df_filtrado_ocorrencias.columns else "Cliente"
-            col3.metric("Clientes Afetados", df_filtrado_ocorrencias[coluna_cliente].nunique())
+            col1.metric("Total de Erros", resultado["total_erros"])
+            col2.metric("Erros Resolvidos", resultado["erros_resolvidos"])
+            col3.metric("Clientes Afetados", resultado["clientes_afetados"])
 
             st.markdown("---")
 
-            if not df_filtrado_ocorrencias.empty:
-                df_tipo_erro = df_filtrado_ocorrencias["Tipo de Erro"].value_counts().reset_index()
-                df_tipo_erro.columns = ["Tipo de Erro", "Qtde"]
-
-                fig_tipo = px.funnel(df_tipo_erro, y="Tipo de Erro", x="Qtde", title="Erros por Tipo")
+            if resultado["total_erros"] > 0:
+                fig_tipo = grafico("funnel", resultado["tipo_erro"], y="Tipo de Erro", x="Qtde", title="Erros por Tipo")
                 st.plotly_chart(fig_tipo, use_container_width=True)
 
-                fig_turno = px.pie(df_filtrado_ocorrencias, names="Turno", title="Distribuição de Erros por Turno")
+                fig_turno = grafico("pie", resultado["erros_turno"], names="Turno", values="Qtde", title="Distribuição de Erros por Turno")
                 st.plotly_chart(fig_turno, use_container_width=True)
 
-                erros_dia = df_filtrado_ocorrencias.groupby(df_filtrado_ocorrencias["Data"].dt.date).size().reset_index(name="Erros")
-                fig_evolucao = px.line(erros_dia, x="Data", y="Erros", title="Evolução Diária de Erros")
+                fig_evolucao = grafico("line", resultado["erros_dia"], x="Data", y="Erros", title="Evolução Diária de Erros")
                 st.plotly_chart(fig_evolucao, use_container_width=True)
 
             st.markdown("### 🔢 Registros Filtrados")
-            st.dataframe(
-                df_filtrado_ocorrencias, 
+            tabela_paginada(
+                df_filtrado_ocorrencias,
+                key="registros_ocorrencias",
+                total=resultado["total_erros"],
                 column_config={
                     "Data": st.column_config.DateColumn(
                         "Data", 
                         format="DD/MM/YYYY"
                     ),
                 },
-                width='stretch', 
-                hide_index=True
             )
 
             # st.dataframe(df_ocorrencias)
@@ -187,6 +231,24 @@ def dashboard():
     else:
         st.write("📦 Recebimento - em construção...")
 
+def filtrar_desacordos(df_desacordos, data_inicio, data_fim, erro_sel, setor_sel, status_sel):
+    df_desacordos_filtrado = filtrar_periodo(df_desacordos, data_inicio, data_fim, ordenado=True)
+
+    # --- Aplicar filtros extras ---
+    if erro_sel != "Todos":
+        df_desacordos_filtrado = df_desacordos_filtrado[
+            df_desacordos_filtrado["MOTIVO DA SUBSTITUIÇÃO"] == erro_sel
+        ]
+    if setor_sel != "Todos":
+        df_desacordos_filtrado = df_desacordos_filtrado[
+            df_desacordos_filtrado["Setor Responsavel"] == setor_sel
+        ]
+    if status_sel != "Todos":
+        df_desacordos_filtrado = df_desacordos_filtrado[
+            df_desacordos_filtrado["Pendências"] == status_sel
+        ]
+    return df_desacordos_filtrado
+
 def desacordos():
     st.title("❌ Dashboard de Desacordos / Ocorrências")
 
@@ -237,24 +299,10 @@ def desacordos():
         else:
             data_inicio, data_fim = pd.to_datetime(data), pd.to_datetime(data)
 
-        df_desacordos_filtrado = df_desacordos[
-            (df_desacordos["Data"] >= data_inicio) &
-            (df_desacordos["Data"] <= data_fim)
-        ]
-
-        # --- Aplicar filtros extras ---
-        if erro_sel != "Todos":
-            df_desacordos_filtrado = df_desacordos_filtrado[
-                df_desacordos_filtrado["MOTIVO DA SUBSTITUIÇÃO"] == erro_sel
-            ]
-        if setor_sel != "Todos":
-            df_desacordos_filtrado = df_desacordos_filtrado[
-                df_desacordos_filtrado["Setor Responsavel"] == setor_sel
-            ]
-        if status_sel != "Todos":
-            df_desacordos_filtrado = df_desacordos_filtrado[
-                df_desacordos_filtrado["Pendências"] == status_sel
-            ]
+        df_desacordos_filtrado = servico_dados().memo(
+            ["desacordos"], filtrar_desacordos,
+            data_inicio, data_fim, erro_sel, setor_sel, status_sel
+        )
     # --- Dashboard ---
     if not df_desacordos_filtrado.empty:
         col1, col2, col3 = st.columns(3)
@@ -267,21 +315,22 @@ def desacordos():
         st.markdown("---")
 
         # Motivos
-        df_tipo_erro = df_desacordos_filtrado["MOTIVO DA SUBSTITUIÇÃO"].value_counts().reset_index()
+        df_tipo_erro = df_desacordos_filtrado["MOTIVO DA SUBSTITUIÇÃO"].value_counts().loc[lambda s: s > 0].reset_index()
         df_tipo_erro.columns = ["Tipo de Erro", "Qtde"]
-        fig_tipo = px.bar(df_tipo_erro, y="Tipo de Erro", x="Qtde", orientation="h",
+        fig_tipo = grafico("bar", df_tipo_erro, y="Tipo de Erro", x="Qtde", orientation="h",
                           title="Erros por Tipo", text="Qtde")
         st.plotly_chart(fig_tipo, use_container_width=True)
 
         # Setor
         if "Setor Responsavel" in df_desacordos_filtrado.columns:
-            fig_setor = px.pie(df_desacordos_filtrado, names="Setor Responsavel",
+            erros_setor = df_desacordos_filtrado.groupby("Setor Responsavel", observed=True).size().reset_index(name="Qtde")
+            fig_setor = grafico("pie", erros_setor, names="Setor Responsavel", values="Qtde",
                                title="Erros por Setor Responsável")
             st.plotly_chart(fig_setor, use_container_width=True)
 
         # Evolução
         erros_dia = df_desacordos_filtrado.groupby(df_desacordos_filtrado["Data"].dt.date).size().reset_index(name="Erros")
-        fig_evolucao = px.line(erros_dia, x="Data", y="Erros", title="Evolução Diária de Erros", markers=True)
+        fig_evolucao = grafico("line", erros_dia, x="Data", y="Erros", title="Evolução Diária de Erros", markers=True)
         st.plotly_chart(fig_evolucao, use_container_width=True)
 
         # Ranking clientes
@@ -293,36 +342,36 @@ def desacordos():
         # Ranking Expedidor
         if "Expedidor do Erro" in df_desacordos_filtrado.columns:
             ranking_expedidor = (
-                df_desacordos_filtrado.groupby("Expedidor do Erro")
+                df_desacordos_filtrado.groupby("Expedidor do Erro", observed=True)
                 .size()
                 .reset_index(name="Qtde de Erros")
                 .sort_values("Qtde de Erros", ascending=False)
             )
             if not ranking_expedidor.empty:
                 st.markdown("### 🏆 Ranking de Erros por Expedidor")
-                fig_expedidor = px.bar(
+                fig_expedidor = grafico(
+                    "bar",
                     ranking_expedidor,
                     x="Qtde de Erros",
                     y="Expedidor do Erro",
                     orientation="h",
                     text="Qtde de Erros",
                     title="Ranking dos Erros por Expedidor",
+                    layout=dict(yaxis={'categoryorder': 'total ascending'}),
                 )
-                fig_expedidor.update_layout(yaxis={'categoryorder': 'total ascending'})
                 st.plotly_chart(fig_expedidor, use_container_width=True)
 
         st.markdown("### 📋 Registros Filtrados")
         
-        st.dataframe(
-            df_desacordos_filtrado, 
+        tabela_paginada(
+            df_desacordos_filtrado,
+            key="registros_desacordos",
             column_config={
                 "Data": st.column_config.DateColumn(
                     "Data", 
                     format="DD/MM/YYYY"
                 ),
             },
-            width='stretch',
-            hide_index=True
         )
 
     else:
@@ -3,7 +3,9 @@ import pandas as pd
 import streamlit as st 
 import httpx
 import asyncio
-from database import conhecimentos
+from servico import ativar_copy_on_write, obter_dados
+
+ativar_copy_on_write()
 
 # Função para limpar o CNPJ
 def limpar_cnpj(cnpj):
@@ -41,7 +43,7 @@ async def consultar_varios_cnpjs(cnpjs):
     return await asyncio.gather(*tarefas)
 
 def cte():
-    df = conhecimentos()
+    df = obter_dados(["conhecimentos"])["conhecimentos"]
 
     st.set_page_config(page_title="Conhecimentos", page_icon="💵")
     st.set_page_config(layout="wide")
@@ -1,10 +1,14 @@
 import requests
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
-from openrouteservice import convert
-from geopy.distance import geodesic
 import pandas as pd
+from geocodificacao import geocodificar
+from cotacao import FRETE_POR_KM, cotar_lote, ler_planilha_lote
+from pedagios import IndicePracas, RAIO_PEDAGIO_KM, pedagios_na_rota
+from rotas import FOLGA_CORREDOR_KM, buscar_rota, corredor, decodificar, simplificar
+
+# folium e streamlit_folium (e o openrouteservice, em rotas) são importados dentro
+# das funções que os usam: a página (título e campos) aparece antes de
+# pagar o import dessas bibliotecas e das chamadas de rota.
 
 # ---------------------------
 # Funções de suporte
@@ -25,41 +29,21 @@ def load_pedagios():
     df["lon"] = df["lon"].astype(float)
     return df
 
+# Índice espacial das praças, montado uma vez por processo. As candidatas
+# saem do corredor reduzido da rota (raio + folga dele) e são confirmadas
+# contra os pontos originais
+@st.cache_resource
+def indice_pracas():
+    return IndicePracas(load_pedagios(), raio_km=RAIO_PEDAGIO_KM, folga_km=FOLGA_CORREDOR_KM)
+
 def calcular_pedagios(coords):
-    df = load_pedagios()
-    pedagios_rota = []
-    total_valor = 0
-
-    # Adiciona coluna de tupla de coordenadas
-    df["coords"] = list(zip(df["lat"], df["lon"]))
-
-    for ponto in coords:
-        # Filtra pedágios próximos (<5 km)
-        proximos = df[df["coords"].apply(lambda c: geodesic(c, ponto).km < 5)]
-        for _, row in proximos.iterrows():
-            valor = float(row.get("valor_leve", 0))
-            pedagios_rota.append({
-                "nome": row["praca"],
-                "rodovia": row.get("rodovia", ""),
-                "valor": valor,
-                "lat": row["lat"],
-                "lon": row["lon"]
-            })
-            total_valor += valor
-
-    return pedagios_rota, total_valor
+    # Cada praça a menos de 5 km da rota, uma vez só
+    return pedagios_na_rota(indice_pracas(), coords, corredor(coords))
 
+# Cache persistente em SQLite (ver geocodificacao.py): reruns e cotações
+# repetidas para os mesmos clientes não vão ao Nominatim
 def get_coords(endereco):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": endereco, "format": "json"}
-    headers = {"User-Agent": "MeuApp/1.0 (email@exemplo.com)"}
-    resp = requests.get(url, params=params, headers=headers)
-    if resp.status_code != 200:
-        return None
-    dados = resp.json()
-    if not dados:
-        return None
-    return float(dados[0]["lat"]), float(dados[0]["lon"])
+    return geocodificar(endereco)
 
 def fetch_api(remetente, destinatario):
     coord_origem = get_coords(remetente)
@@ -67,20 +51,70 @@ def fetch_api(remetente, destinatario):
     if not coord_origem or not coord_destino:
         return None
 
-    ORS_API_KEY = "eyJvcmciOiI1YjNjZTM1OTc4NTExMTAwMDFjZjYyNDgiLCJpZCI6Ijc4NDkzZWRjZThhMTQ4NjZiMGUwNzMxNTA5MzI3Zjk3IiwiaCI6Im11cm11cjY0In0="
-    url = "https://api.openrouteservice.org/v2/directions/driving-car"
-    headers = {"Authorization": ORS_API_KEY}
-    body = {
-        "coordinates": [
-            [coord_origem[1], coord_origem[0]],
-            [coord_destino[1], coord_destino[0]]
-        ]
-    }
-    resp = requests.post(url, json=body, headers=headers)
-    if resp.status_code != 200:
-        st.error(f"Erro ORS API: {resp.status_code}")
+    # Rota em cache por origem/destino (ver rotas.py): trocar o veículo
+    # ou repetir uma cotação não chama o ORS de novo
+    try:
+        rota = buscar_rota(coord_origem, coord_destino)
+    except requests.RequestException as e:
+        st.error(f"Erro ORS API: {e}")
+        return None
+    except RuntimeError as e:  # chave do ORS não configurada
+        st.error(str(e))
         return None
-    return resp.json()
+    return {"routes": [rota]} if rota else None
+
+# ---------------------------
+# Cotação em lote
+# ---------------------------
+
+REDESENHAR_A_CADA = 20  # cotações concluídas entre atualizações da tabela
+
+def cotacao_lote():
+    arquivo = st.file_uploader(
+        "📄 Planilha com as colunas Remetente, Destinatário e Veículo (CSV ou XLSX):",
+        type=["csv", "xlsx"]
+    )
+    if arquivo is None:
+        return
+
+    try:
+        linhas = ler_planilha_lote(arquivo.getvalue(), arquivo.name)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.caption(f"{len(linhas)} rotas na planilha.")
+
+    # O resultado fica na sessão: o clique no download (ou em qualquer outro
+    # widget) reroda a página e a tabela continua lá. Outro arquivo descarta
+    arquivo_atual = (arquivo.name, arquivo.size)
+    if st.session_state.get("cotacoes_arquivo") != arquivo_atual:
+        st.session_state.pop("cotacoes", None)
+
+    tabela = st.empty()
+    if st.button("🚀 Cotar todas"):
+        # Tabela preenchida conforme as cotações terminam, na ordem da
+        # planilha; redesenhada a cada lote de resultados, não a cada um
+        progresso = st.progress(0.0, text="Cotando...")
+        resultados = [None] * len(linhas)
+        for feitas, (posicao, resultado) in enumerate(cotar_lote(linhas, indice_pracas()), start=1):
+            resultados[posicao] = resultado
+            if feitas % REDESENHAR_A_CADA == 0:
+                progresso.progress(feitas / len(linhas), text=f"Cotando... {feitas}/{len(linhas)}")
+                tabela.dataframe(pd.DataFrame([r for r in resultados if r is not None]), use_container_width=True)
+        progresso.empty()
+        st.session_state["cotacoes"] = pd.DataFrame(resultados)
+        st.session_state["cotacoes_arquivo"] = arquivo_atual
+
+    df_resultados = st.session_state.get("cotacoes")
+    if df_resultados is None:
+        return
+    tabela.dataframe(df_resultados, use_container_width=True)
+    st.download_button(
+        "⬇️ Baixar cotações (CSV)",
+        df_resultados.to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+        file_name="cotacoes.csv",
+        mime="text/csv"
+    )
 
 # ---------------------------
 # App Streamlit
@@ -90,16 +124,22 @@ def Cargas():
     st.set_page_config(page_title="Cargas", layout="wide")
     st.title("🚚 Frete Minimo")
 
+    modo = st.radio("Modo:", ["Cotação única", "Cotação em lote"], horizontal=True, label_visibility="collapsed")
+    if modo == "Cotação em lote":
+        cotacao_lote()
+        return
+
     col1, col2, col3 = st.columns([1, 2, 2])
     type_vehicle = col1.selectbox(
         "🚗 Tipo de veículo:",
-        options=("Carreta", "Carreta Trucada", "Truck", "Rodo-trem", "Vanderleia"),
+        options=tuple(FRETE_POR_KM),
         index=0
     )
     remetente = col2.text_input("🚩 Remetente:", value="Av. Miguel Pastuszak, 532")
     destinatario = col3.text_input("🚩 Destinatário:", value="R. Mansueto Bossardi, 375")
 
-    rota = fetch_api(remetente, destinatario)
+    with st.spinner("Calculando rota..."):
+        rota = fetch_api(remetente, destinatario)
     if not rota or "routes" not in rota:
         st.error("Não foi possível obter a rota.")
         # st.json(rota)
@@ -116,28 +156,23 @@ def Cargas():
     col1.metric("Distância (km)", f"{distancia_km:.2f}")
     col2.metric("Tempo estimado (h)", f"{duracao_h:.2f}")
 
-    frete_dict = {
-        "Carreta": 7,
-        "Carreta Trucada": 8,
-        "Truck": 5,
-        "Rodo-trem": 15,
-        "Vanderleia": 11
-    }
-    frete = distancia_km * frete_dict.get(type_vehicle, 0)
+    frete = distancia_km * FRETE_POR_KM.get(type_vehicle, 0)
     col3.metric("Valor frete (R$)", f"{frete:.2f}")
 
     # ---------------------------
     # Decodificar coordenadas da rota
     # ---------------------------
-    geometry = rota["routes"][0]["geometry"]
-    coords = convert.decode_polyline(geometry)["coordinates"]
-    coords = [(lat, lon) for lon, lat in coords]
+    import folium
+    from streamlit_folium import st_folium
+
+    coords = decodificar(rota["routes"][0]["geometry"])
 
     # ---------------------------
     # Criar mapa e plotar rota
     # ---------------------------
+    # Só o traçado simplificado vai para o HTML do mapa
     mapa = folium.Map(location=coords[0], zoom_start=10)
-    folium.PolyLine(coords, color="blue", weight=5).add_to(mapa)
+    folium.PolyLine(simplificar(coords), color="blue", weight=5).add_to(mapa)
     folium.Marker(coords[0], tooltip="Origem").add_to(mapa)
     folium.Marker(coords[-1], tooltip="Destino").add_to(mapa)
 
@@ -0,0 +1,118 @@
+import numpy as np
+
+# ============================= Pedágios da rota =============================
+# Índice em grade sobre as coordenadas das praças: cada ponto da rota só é
+# comparado com as praças das células vizinhas, com distância haversine
+# vetorizada em numpy, em vez de um geodesic() por praça para cada ponto.
+# Cada praça próxima da rota entra uma única vez, na ordem em que a rota
+# passa por ela.
+RAIO_PEDAGIO_KM = 5
+RAIO_TERRA_KM = 6371.0088
+_KM_POR_GRAU = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class IndicePracas:
+    # folga_km: distância máxima entre um ponto da rota e o corredor reduzido
+    # passado a na_rota (ver rotas.corredor); zero se não houver corredor
+    def __init__(self, pracas, raio_km=RAIO_PEDAGIO_KM, folga_km=0.0):
+        self.pracas = pracas.reset_index(drop=True)
+        self.raio_km = raio_km
+        self.folga_km = folga_km
+        self.lat = self.pracas["lat"].to_numpy(dtype=float)
+        self.lon = self.pracas["lon"].to_numpy(dtype=float)
+
+        # Célula quadrada em graus com lado >= raio + folga em qualquer
+        # direção (o grau de longitude encolhe com a latitude); assim basta
+        # olhar a célula do ponto e as 8 vizinhas
+        lat_max = min(float(np.abs(self.lat).max()) if len(self.lat) else 0.0, 80.0)
+        self.celula = (raio_km + folga_km) / (_KM_POR_GRAU * np.cos(np.radians(lat_max)))
+
+        self._grade = {}
+        for i, chave in enumerate(zip(*self._celulas(self.lat, self.lon))):
+            self._grade.setdefault(chave, []).append(i)
+
+    def _celulas(self, lat, lon):
+        return (
+            np.floor(np.asarray(lat) / self.celula).astype(np.int64),
+            np.floor(np.asarray(lon) / self.celula).astype(np.int64),
+        )
+
+    # Praças candidatas: as das células (e vizinhas) por onde a rota passa
+    def _candidatas(self, lat, lon):
+        celulas = set(zip(*self._celulas(lat, lon)))
+        candidatas = set()
+        for ci, cj in celulas:
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    candidatas.update(self._grade.get((ci + di, cj + dj), ()))
+        return np.fromiter(sorted(candidatas), dtype=np.int64, count=len(candidatas))
+
+    # [(primeiro ponto a menos de raio_km, praça)] das praças com algum ponto
+    # de (lat, lon) nesse raio
+    def _proximas(self, pracas, lat, lon, raio_km):
+        encontradas = []
+        for praca in pracas:
+            # Só os pontos numa caixa ao redor da praça entram na conta
+            perto = (
+                (np.abs(lat - self.lat[praca]) <= self.celula)
+                & (np.abs(lon - self.lon[praca]) <= self.celula)
+            )
+            idx = np.flatnonzero(perto)
+            if not len(idx):
+                continue
+            dentro = haversine_km(lat[idx], lon[idx], self.lat[praca], self.lon[praca]) < raio_km
+            if dentro.any():
+                encontradas.append((idx[np.argmax(dentro)], praca))
+        return encontradas
+
+    # Índices (em self.pracas) das praças a até raio_km de algum ponto da
+    # rota, ordenados pelo primeiro ponto da rota que passa perto delas.
+    # Com `corredor` a busca roda sobre ele com raio_km + folga_km, o que
+    # não deixa escapar nenhuma praça, e cada candidata é confirmada com
+    # raio_km contra os pontos da rota original próximos dela
+    def na_rota(self, coords, corredor=None):
+        if not len(coords) or not len(self.lat):
+            return []
+        pontos = np.asarray(coords, dtype=float)
+        lat, lon = pontos[:, 0], pontos[:, 1]
+
+        if corredor is None:
+            candidatas = self._candidatas(lat, lon)
+        else:
+            reduzido = np.asarray(corredor, dtype=float)
+            lat_c, lon_c = reduzido[:, 0], reduzido[:, 1]
+            candidatas = [
+                praca for _, praca in
+                self._proximas(self._candidatas(lat_c, lon_c), lat_c, lon_c, self.raio_km + self.folga_km)
+            ]
+
+        return [praca for _, praca in sorted(self._proximas(candidatas, lat, lon, self.raio_km))]
+
+
+# (lista de praças da rota, soma das tarifas de veículo leve)
+def pedagios_na_rota(indice, coords, corredor=None):
+    pedagios_rota = []
+    total_valor = 0
+
+    for i in indice.na_rota(coords, corredor):
+        row = indice.pracas.iloc[i]
+        valor = float(row.get("valor_leve", 0))
+        pedagios_rota.append({
+            "nome": row["praca"],
+            "rodovia": row.get("rodovia", ""),
+            "valor": valor,
+            "lat": row["lat"],
+            "lon": row["lon"]
+        })
+        total_valor += valor
+
+    return pedagios_rota, total_valor
@@ -0,0 +1,107 @@
+# planilhas_locais.py
+# Imitação local da exportação CSV do Google Sheets, para testar o
+# carregador em lote (database.carregar_planilhas) sem rede:
+#
+#   python planilhas_locais.py --porta 8090 --atraso fechamento=3 --falhar cte=2
+#   SHEETS_BASE_URL=http://localhost:8090 SNAPSHOT_DIR=/tmp/snapshots \
+#   streamlit run Hello.py
+#
+# Responde /<planilha>/export?format=csv&gid=<gid> com o CSV da planilha
+# correspondente em PLANILHAS, lido de database/fixtures/<nome>.csv (ou da
+# pasta --pasta, para usar exportações reais). --atraso segura a resposta
+# de uma planilha por alguns segundos: a carga em lote deve levar perto do
+# tempo da mais lenta, não a soma. --falhar devolve 503 nas primeiras N
+# requisições de uma planilha, para ver as novas tentativas e, com N maior
+# que as tentativas, o uso do snapshot anterior.
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from database import PLANILHAS
+
+_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "fixtures")
+
+
+# "nome=valor" repetível -> {nome: valor}
+def _por_planilha(itens, tipo):
+    valores = {}
+    for item in itens or []:
+        nome, _, valor = item.partition("=")
+        if nome not in PLANILHAS:
+            raise SystemExit(f"Planilha desconhecida: {nome}")
+        valores[nome] = tipo(valor)
+    return valores
+
+
+class _Handler(BaseHTTPRequestHandler):
+    pasta = _FIXTURES
+    atrasos = {}
+    falhas = {}
+    _lock = threading.Lock()
+
+    def _responder(self, status, corpo, tipo="text/plain; charset=utf-8"):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _planilha(self, url):
+        partes = url.path.strip("/").split("/")
+        gid = parse_qs(url.query).get("gid", [""])[0]
+        if len(partes) != 2 or partes[1] != "export":
+            return None
+        for nome, planilha in PLANILHAS.items():
+            if planilha["planilha"] == partes[0] and planilha["gid"] == gid:
+                return nome
+        return None
+
+    def do_GET(self):
+        nome = self._planilha(urlparse(self.path))
+        if nome is None:
+            return self._responder(404, "not found")
+        time.sleep(self.atrasos.get(nome, 0))
+        with self._lock:
+            falhar = self.falhas.get(nome, 0) > 0
+            if falhar:
+                self.falhas[nome] -= 1
+        if falhar:
+            print(f"✖ {nome}: 503")
+            return self._responder(503, "unavailable")
+        try:
+            with open(os.path.join(self.pasta, f"{nome}.csv"), encoding="utf-8") as f:
+                texto = f.read()
+        except OSError:
+            return self._responder(404, f"sem fixture para {nome}")
+        print(f"✔ {nome}")
+        self._responder(200, texto, "text/csv; charset=utf-8")
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportação CSV das planilhas, local, para testes.")
+    parser.add_argument("--porta", type=int, default=8090)
+    parser.add_argument("--pasta", default=_FIXTURES, help="pasta com <nome>.csv de cada planilha")
+    parser.add_argument("--atraso", action="append", metavar="NOME=S", help="segundos antes de responder")
+    parser.add_argument("--falhar", action="append", metavar="NOME=N", help="responde 503 nas N primeiras")
+    args = parser.parse_args(argv)
+
+    _Handler.pasta = args.pasta
+    _Handler.atrasos = _por_planilha(args.atraso, float)
+    _Handler.falhas = _por_planilha(args.falhar, int)
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), _Handler)
+    print(f"🧪 Planilhas locais em http://127.0.0.1:{args.porta} (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# relatorio_lote.py
+# Gera e envia o relatório de Fechamento de todos os turnos (e, se pedido,
+# de um intervalo de datas) sem passar pelo Streamlit. Cada planilha é
+# baixada uma única vez; os recortes por dia são feitos uma vez e
+# compartilhados entre os turnos, e todos os e-mails saem na mesma sessão
+# SMTP. Pensado para cron/systemd, por exemplo:
+#
+#   python relatorio_lote.py                         # hoje, todos os turnos
+#   python relatorio_lote.py --inicio 2026-10-01 --fim 2026-10-07
+#   python relatorio_lote.py --turnos 1º 2º --saida relatorios_eml/
+#
+# Credenciais: EMAIL_USER, EMAIL_PASS e EMAIL_CC do ambiente ou, na falta,
+# de .streamlit/secrets.toml (as mesmas chaves usadas pelo Hello.py).
+import argparse
+import os
+import sys
+import tomllib
+from datetime import date, datetime, timedelta
+
+from envio_email import SMTP_LOCAL
+from servico import ativar_copy_on_write, obter_dados, filtrar_periodo
+
+ativar_copy_on_write()
+
+_SECRETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+
+
+def _credenciais():
+    segredos = {}
+    try:
+        with open(_SECRETS, "rb") as f:
+            segredos = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        pass
+    return {
+        chave: os.environ.get(chave, segredos.get(chave))
+        for chave in ("EMAIL_USER", "EMAIL_PASS", "EMAIL_CC")
+    }
+
+
+def _dias(inicio, fim):
+    dia = inicio
+    while dia <= fim:
+        yield dia
+        dia += timedelta(days=1)
+
+
+# Um pedido (argumentos de montar_relatorio_email) por dia e turno, igual ao
+# que o formulário do Hello.py monta: fechamento do dia restrito aos
+# colaboradores que digitaram CT-e no turno
+def montar_pedidos(dados, dias, turnos, destinatario, ocorrencias=""):
+    df, df_cte, df_ocorrencias = dados["fechamento"], dados["cte"], dados["recebimento"]
+    if not turnos:
+        turnos = sorted(df_cte["Turno"].dropna().unique())
+
+    pedidos = []
+    for dia in dias:
+        df_dia = filtrar_periodo(df, dia, dia, ordenado=True)
+        cte_dia = filtrar_periodo(df_cte, dia, dia, ordenado=True)
+        for turno in turnos:
+            colab = cte_dia.loc[cte_dia["Turno"] == turno, "Responsável"].unique()
+            pedidos.append({
+                "df": df_dia[df_dia["Colaborador"].isin(colab)].reset_index(drop=True),
+                "destinatario": destinatario,
+                "ocorrencias": ocorrencias,
+                "turno": turno,
+                "ctes": cte_dia,
+                "df_ocorrencias": df_ocorrencias,
+                "data": datetime.combine(dia, datetime.min.time()),
+            })
+    return pedidos
+
+
+def _salvar(pedidos, remetente, pasta):
+    from relatorios import montar_relatorio_email
+
+    os.makedirs(pasta, exist_ok=True)
+    for pedido in pedidos:
+        msg = montar_relatorio_email(remetente=remetente, **pedido)
+        nome = f"fechamento_{pedido['data']:%Y-%m-%d}_{pedido['turno']}.eml".replace(" ", "_")
+        with open(os.path.join(pasta, nome), "wb") as f:
+            f.write(msg.as_bytes())
+        print(f"💾 {nome}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Envia o relatório de Fechamento de todos os turnos.")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date.today(), help="primeiro dia (AAAA-MM-DD), padrão hoje")
+    parser.add_argument("--fim", type=date.fromisoformat, help="último dia (AAAA-MM-DD), padrão igual ao início")
+    parser.add_argument("--turnos", nargs="+", help="turnos a enviar, padrão todos os da planilha de CT-e")
+    parser.add_argument("--destinatario", help="padrão EMAIL_CC")
+    parser.add_argument("--ocorrencias", default="", help="observações incluídas em todos os relatórios")
+    parser.add_argument("--saida", help="grava os e-mails (.eml) nesta pasta em vez de enviar")
+    args = parser.parse_args(argv)
+
+    fim = args.fim or args.inicio
+    if fim < args.inicio:
+        parser.error("--fim anterior a --inicio")
+
+    credenciais = _credenciais()
+    remetente = credenciais["EMAIL_USER"] or ""
+    destinatario = args.destinatario or credenciais["EMAIL_CC"]
+    if not destinatario:
+        parser.error("destinatário não configurado (EMAIL_CC ou --destinatario)")
+
+    dados = obter_dados(["fechamento", "cte", "recebimento"])
+    pedidos = montar_pedidos(dados, list(_dias(args.inicio, fim)), args.turnos, destinatario, args.ocorrencias)
+    if not pedidos:
+        print("⚠️ Nenhum turno encontrado para gerar relatório.")
+        return 0
+
+    if args.saida:
+        _salvar(pedidos, remetente, args.saida)
+        return 0
+
+    if not remetente or not (credenciais["EMAIL_PASS"] or SMTP_LOCAL):
+        parser.error("credenciais de e-mail ausentes (EMAIL_USER/EMAIL_PASS)")
+
+    from relatorios import enviar_relatorios_lote
+
+    erros = enviar_relatorios_lote(pedidos, remetente, credenciais["EMAIL_PASS"])
+    return 1 if any(erro is not None for erro in erros) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+import requests
+
+from geocodificacao import CARGAS_CACHE_DIR
+
+# ============================= Geometria das rotas =============================
+# A geometria do ORS tem um ponto a cada poucos metros; uma rota longa passa
+# de dezenas de milhares de pontos. Duas versões reduzidas saem dela:
+#   - mapa: Douglas–Peucker com tolerância em metros, só para desenhar;
+#   - corredor: Douglas–Peucker com tolerância menor + pontos a cada
+#     PASSO_CORREDOR_M, para a busca de pedágios. Todo ponto da rota
+#     original fica a no máximo FOLGA_CORREDOR_KM de um ponto do corredor,
+#     então buscar candidatas no corredor com o raio somado a essa folga
+#     garante que nenhuma praça próxima da rota fica de fora; a distância
+#     de cada candidata é confirmada na rota original (pedagios.py).
+TOLERANCIA_MAPA_M = float(os.environ.get("TOLERANCIA_MAPA_M", 25))
+TOLERANCIA_CORREDOR_M = float(os.environ.get("TOLERANCIA_CORREDOR_M", 50))
+PASSO_CORREDOR_M = float(os.environ.get("PASSO_CORREDOR_M", 500))
+FOLGA_CORREDOR_KM = (TOLERANCIA_CORREDOR_M + PASSO_CORREDOR_M / 2) / 1000
+
+_RAIO_TERRA_M = 6371008.8
+
+
+# (lat, lon) em graus -> (x, y) em metros, projeção local em torno do
+# meridiano central da rota (erro desprezível na escala das tolerâncias)
+def _projetar(pontos):
+    lat = np.radians(pontos[:, 0])
+    lon = np.radians(pontos[:, 1])
+    lon0 = (lon.min() + lon.max()) / 2
+    return np.column_stack(((lon - lon0) * np.cos(lat), lat)) * _RAIO_TERRA_M
+
+
+# Distância de cada ponto de xy ao segmento a-b
+def _distancia_segmento(xy, a, b):
+    ab = b - a
+    comprimento2 = float(ab @ ab)
+    if comprimento2 == 0:
+        return np.hypot(*(xy - a).T)
+    t = np.clip(((xy - a) @ ab) / comprimento2, 0, 1)
+    return np.hypot(*(xy - (a + t[:, None] * ab)).T)
+
+
+# Douglas–Peucker iterativo (sem recursão, rotas longas não estouram a pilha)
+def simplificar(coords, tolerancia_m=TOLERANCIA_MAPA_M):
+    pontos = np.asarray(coords, dtype=float)
+    n = len(pontos)
+    if n < 3 or tolerancia_m <= 0:
+        return [tuple(p) for p in pontos]
+
+    xy = _projetar(pontos)
+    manter = np.zeros(n, dtype=bool)
+    manter[[0, -1]] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        i, j = pilha.pop()
+        if j - i < 2:
+            continue
+        distancias = _distancia_segmento(xy[i + 1:j], xy[i], xy[j])
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia_m:
+            meio = i + 1 + k
+            manter[meio] = True
+            pilha.append((i, meio))
+            pilha.append((meio, j))
+
+    return [tuple(p) for p in pontos[manter]]
+
+
+# Insere pontos ao longo dos segmentos para nenhum trecho passar de passo_m
+def densificar(coords, passo_m=PASSO_CORREDOR_M):
+    pontos = np.asarray(coords, dtype=float)
+    if len(pontos) < 2:
+        return [tuple(p) for p in pontos]
+
+    xy = _projetar(pontos)
+    comprimentos = np.hypot(*np.diff(xy, axis=0).T)
+    partes = np.maximum(np.ceil(comprimentos / passo_m).astype(int), 1)
+
+    # Para cada segmento s, frações 0, 1/partes, ..., (partes-1)/partes
+    inicio = np.repeat(np.arange(len(partes)), partes)
+    fracao = (np.arange(partes.sum()) - np.repeat(np.cumsum(partes) - partes, partes)) / np.repeat(partes, partes)
+    novos = pontos[inicio] + fracao[:, None] * (pontos[inicio + 1] - pontos[inicio])
+    novos = np.vstack([novos, pontos[-1:]])
+    return [tuple(p) for p in novos]
+
+
+def corredor(coords):
+    return densificar(simplificar(coords, TOLERANCIA_CORREDOR_M), PASSO_CORREDOR_M)
+
+
+# ============================= Rotas (ORS) com cache =============================
+# A rota depende só da origem, do destino e do perfil de roteamento (trocar o
+# tipo de veículo não muda distância nem traçado). O resumo e a geometria
+# codificada ficam em SQLite pela chave (coordenadas arredondadas, perfil);
+# entradas vencem em ROTA_TTL_DIAS e, passando de ROTA_CACHE_MAX, as menos
+# usadas são descartadas. Chamadas ao ORS ficam espaçadas em ORS_INTERVALO_S
+# (o plano gratuito aceita 40 por minuto). A chave do ORS vem de
+# ORS_API_KEY no ambiente ou, dentro do Streamlit, de st.secrets; só é lida
+# quando a rota não está no cache.
+ORS_URL = os.environ.get("ORS_URL", "https://api.openrouteservice.org/v2/directions")
+ROTA_CASAS = int(os.environ.get("ROTA_CASAS", 4))  # 4 casas ~ 11 m
+ROTA_TTL = timedelta(days=float(os.environ.get("ROTA_TTL_DIAS", 30)))
+ROTA_CACHE_MAX = int(os.environ.get("ROTA_CACHE_MAX", 5000))
+ORS_INTERVALO_S = float(os.environ.get("ORS_INTERVALO_S", 1.5))
+_BANCO_ROTAS = os.path.join(CARGAS_CACHE_DIR, "rotas.sqlite")
+
+_ultima_consulta = 0.0
+_consulta_lock = threading.Lock()
+
+
+def _chave_ors():
+    chave = os.environ.get("ORS_API_KEY")
+    if not chave and "streamlit" in sys.modules:
+        # st.secrets só dentro do app (a CLI não importa o Streamlit); sem
+        # secrets.toml o acesso levanta exceção
+        try:
+            import streamlit as st
+
+            chave = st.secrets.get("ORS_API_KEY")
+        except Exception:
+            chave = None
+    if not chave:
+        raise RuntimeError(
+            "ORS_API_KEY não configurada: defina a variável de ambiente ou "
+            "a chave ORS_API_KEY em .streamlit/secrets.toml."
+        )
+    return chave
+
+
+@contextmanager
+def _conectar():
+    os.makedirs(CARGAS_CACHE_DIR, exist_ok=True)
+    conexao = sqlite3.connect(_BANCO_ROTAS, timeout=10)
+    try:
+        with conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS rotas ("
+                " chave TEXT PRIMARY KEY, summary TEXT NOT NULL, geometry TEXT NOT NULL,"
+                " criado_em TEXT NOT NULL, usado_em TEXT NOT NULL)"
+            )
+            yield conexao
+    finally:
+        conexao.close()
+
+
+def _chave_rota(origem, destino, perfil):
+    pontos = [round(float(c), ROTA_CASAS) for c in (*origem, *destino)]
+    return f"{perfil}:" + ",".join(f"{c:.{ROTA_CASAS}f}" for c in pontos)
+
+
+def _ler_rota(chave):
+    with _conectar() as conexao:
+        linha = conexao.execute(
+            "SELECT summary, geometry, criado_em FROM rotas WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            return None
+        if datetime.now() - datetime.fromisoformat(linha[2]) > ROTA_TTL:
+            conexao.execute("DELETE FROM rotas WHERE chave = ?", (chave,))
+            return None
+        conexao.execute(
+            "UPDATE rotas SET usado_em = ? WHERE chave = ?",
+            (datetime.now().isoformat(), chave),
+        )
+    return {"summary": json.loads(linha[0]), "geometry": linha[1]}
+
+
+def _gravar_rota(chave, rota):
+    agora = datetime.now().isoformat()
+    with _conectar() as conexao:
+        conexao.execute(
+            "INSERT OR REPLACE INTO rotas VALUES (?, ?, ?, ?, ?)",
+            (chave, json.dumps(rota["summary"]), rota["geometry"], agora, agora),
+        )
+        conexao.execute(
+            "DELETE FROM rotas WHERE chave IN ("
+            " SELECT chave FROM rotas ORDER BY usado_em DESC LIMIT -1 OFFSET ?)",
+            (ROTA_CACHE_MAX,),
+        )
+
+
+def _consultar_ors(origem, destino, perfil):
+    global _ultima_consulta
+    chave = _chave_ors()
+    with _consulta_lock:
+        espera = ORS_INTERVALO_S - (time.monotonic() - _ultima_consulta)
+        if espera > 0:
+            time.sleep(espera)
+        _ultima_consulta = time.monotonic()
+    resp = requests.post(
+        f"{ORS_URL}/{perfil}",
+        json={"coordinates": [[origem[1], origem[0]], [destino[1], destino[0]]]},
+        headers={"Authorization": chave},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    dados = resp.json()
+    if not dados.get("routes"):
+        return None
+    return {"summary": dados["routes"][0]["summary"], "geometry": dados["routes"][0]["geometry"]}
+
+
+# (lat, lon) -> {"summary": {...}, "geometry": polyline codificada}, ou None
+# se o ORS não encontrar rota. Erros HTTP/rede sobem como requests.RequestException;
+# sem chave do ORS configurada, RuntimeError
+def buscar_rota(origem, destino, perfil="driving-car"):
+    chave = _chave_rota(origem, destino, perfil)
+    rota = _ler_rota(chave)
+    if rota is None:
+        rota = _consultar_ors(origem, destino, perfil)
+        if rota is not None:
+            _gravar_rota(chave, rota)
+    return rota
+
+
+# Polyline codificada do ORS -> [(lat, lon), ...]
+def decodificar(geometry):
+    from openrouteservice import convert
+
+    return [(lat, lon) for lon, lat in convert.decode_polyline(geometry)["coordinates"]]
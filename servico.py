@@ -0,0 +1,253 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from database import SNAPSHOT_TTL, carregar_planilhas, idade_snapshot
+
+# Com copy-on-write as visões rasas entregues às páginas nunca alteram o
+# frame compartilhado, sem precisar copiar os dados a cada rerun. A opção
+# vale para o processo inteiro, então quem liga são os pontos de entrada
+# (Hello.py, páginas, relatorio_lote.py); sem ela obter() entrega cópias.
+def ativar_copy_on_write():
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except (KeyError, ValueError):
+        pass
+
+def _copy_on_write():
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError:
+        return False
+
+
+# ============================= Serviço de dados =============================
+# Um único dono por processo para cada planilha: todas as sessões e reruns
+# do Streamlit leem o mesmo frame em memória, e uma thread em segundo plano
+# troca o frame quando o snapshot vence. Custo de rede e memória não cresce
+# com o número de operadores conectados. Frames com "Data" são mantidos
+# ordenados por ela para que filtrar_periodo funcione.
+def _ordenar(df):
+    if "Data" in df.columns and not _ordenada(df["Data"]):
+        # NaT no começo: internamente é o menor inteiro, então a busca binária continua válida
+        df = df.sort_values("Data", kind="stable", na_position="first")
+    return df
+
+# Fatia [inicio, fim] (inclusive) de um frame ordenado por `coluna`.
+# Busca binária no índice de datas: O(log n) e devolve uma fatia do frame
+# em vez de montar uma máscara booleana sobre todo o histórico. Os frames
+# do serviço (ordenados em _ordenar) e os rollups passam ordenado=True; para
+# os demais a ordem é conferida antes (O(n)) e, fora de ordem, usa a máscara.
+def filtrar_periodo(df, inicio, fim, coluna="Data", ordenado=False):
+    datas = df[coluna]
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if not ordenado and not _ordenada(datas):
+        return df[(datas >= inicio) & (datas <= fim)]
+    i = datas.searchsorted(inicio, side="left")
+    j = datas.searchsorted(fim, side="right")
+    return df.iloc[i:j]
+
+# NaT é o menor inteiro em datetime64, então "NaT no começo" conta como ordenado
+def _ordenada(datas):
+    if isinstance(datas.dtype, np.dtype) and datas.dtype.kind == "M":
+        valores = datas.to_numpy().view("i8")
+        return bool((valores[1:] >= valores[:-1]).all())
+    return datas.is_monotonic_increasing
+
+
+# ============================= Memo de filtros =============================
+# Guarda resultados de filtros/agregações pela chave (versões das planilhas,
+# filtros). Quando a planilha muda a versão muda junto, então entradas
+# antigas nunca são servidas e saem pelo LRU ou pelo descarte na troca.
+MEMO_TAMANHO = int(os.environ.get("MEMO_TAMANHO", 128))
+
+class MemoLRU:
+    def __init__(self, tamanho=MEMO_TAMANHO):
+        self.tamanho = tamanho
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, calcular):
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+        valor = calcular()
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+        return valor
+
+    def descartar(self, criterio):
+        with self._lock:
+            for chave in [c for c in self._itens if criterio(c)]:
+                del self._itens[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "itens": len(self._itens),
+                "taxa_acerto": self.acertos / total if total else 0.0,
+            }
+
+
+# Intervalo mínimo entre duas verificações da thread de atualização
+ESPERA_MINIMA_S = float(os.environ.get("SERVICO_ESPERA_MIN_S", 30))
+
+class ServicoDados:
+    def __init__(self, intervalo=SNAPSHOT_TTL):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._carga_lock = threading.Lock()
+        self._dados = {}
+        self._versoes = {}
+        self._atualizado_em = {}
+        self._derivados = {}
+        self._memo = MemoLRU()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def obter(self, nomes):
+        return self._obter_com_versoes(nomes)[0]
+
+    # Frames e versões lidos juntos sob o mesmo lock: um resultado derivado
+    # nunca fica guardado com a versão de uma troca que aconteceu no meio
+    def _obter_com_versoes(self, nomes):
+        # Sessões simultâneas esperam a mesma carga em vez de baixar de novo
+        with self._carga_lock:
+            faltando = [nome for nome in nomes if nome not in self._dados]
+            if faltando:
+                self.atualizar(faltando)
+        profunda = not _copy_on_write()
+        with self._lock:
+            frames = {nome: self._dados[nome].copy(deep=profunda) for nome in nomes}
+            versoes = tuple(self._versoes.get(nome, 0) for nome in nomes)
+        return frames, versoes
+
+    def atualizar(self, nomes=None, forcar=False):
+        nomes = list(self._dados) if nomes is None else list(nomes)
+        if not nomes:
+            return
+        falhas = []
+        novos = carregar_planilhas(nomes, forcar=forcar, falhas=falhas)
+        # Sem rede volta o snapshot anterior: o que já está em memória não
+        # mudou, então versão e caches ficam como estão
+        novos = {nome: df for nome, df in novos.items() if nome not in falhas or nome not in self._dados}
+        if not novos:
+            return
+        with self._lock:
+            for nome, df in novos.items():
+                self._dados[nome] = _ordenar(df)
+                self._versoes[nome] = self._versoes.get(nome, 0) + 1
+                self._atualizado_em[nome] = datetime.now()
+        self._memo.descartar(lambda chave: any(nome in chave[1] for nome in novos))
+
+    # Número que muda sempre que o frame da planilha é trocado
+    def versao(self, nome):
+        return self._versoes.get(nome, 0)
+
+    # Resultado de func(frame) calculado uma vez por versão da planilha
+    # (rollups, índices etc.) e compartilhado entre todas as sessões
+    def derivado(self, nome, func):
+        frames, (versao,) = self._obter_com_versoes([nome])
+        df = frames[nome]
+        chave = (nome, func.__module__, func.__qualname__)
+        with self._lock:
+            guardado = self._derivados.get(chave)
+            if guardado and guardado[0] == versao:
+                return guardado[1]
+        resultado = func(df)
+        with self._lock:
+            # Um cálculo lento sobre a versão antiga não sobrescreve o da nova
+            atual = self._derivados.get(chave)
+            if atual is None or atual[0] <= versao:
+                self._derivados[chave] = (versao, resultado)
+        return resultado
+
+    # func(*frames das planilhas `nomes`, *filtros), memorizado por
+    # (func, planilhas, versões, filtros). Os filtros precisam ser hashable.
+    def memo(self, nomes, func, *filtros):
+        frames, versoes = self._obter_com_versoes(nomes)
+        chave = (f"{func.__module__}.{func.__qualname__}", tuple(nomes), versoes, filtros)
+        return self._memo.obter(chave, lambda: func(*[frames[nome] for nome in nomes], *filtros))
+
+    def estatisticas_memo(self):
+        return self._memo.estatisticas()
+
+    def atualizado_em(self, nome):
+        return self._atualizado_em.get(nome)
+
+    # Idade dos dados da planilha: a do snapshot de onde vieram ou, sem
+    # snapshot gravado, desde a última carga
+    def _idade(self, nome):
+        idade = idade_snapshot(nome)
+        if idade is None and nome in self._atualizado_em:
+            idade = datetime.now() - self._atualizado_em[nome]
+        return idade
+
+    def _vencidas(self):
+        vencidas = []
+        for nome in list(self._dados):
+            idade = self._idade(nome)
+            if idade is None or idade >= self.intervalo:
+                vencidas.append(nome)
+        return vencidas
+
+    # Segundos até a próxima planilha vencer, para que nenhuma passe muito do
+    # TTL; nunca menos que ESPERA_MINIMA_S (sem rede elas continuam vencidas)
+    def _espera(self):
+        restantes = [
+            (self.intervalo - idade).total_seconds() if idade is not None else 0
+            for idade in map(self._idade, list(self._dados))
+        ]
+        if not restantes:
+            return self.intervalo.total_seconds()
+        return max(min(restantes), min(ESPERA_MINIMA_S, self.intervalo.total_seconds()))
+
+    def _loop(self):
+        while not self._parar.wait(self._espera()):
+            vencidas = self._vencidas()
+            if not vencidas:
+                continue
+            try:
+                self.atualizar(vencidas)
+            except Exception as e:
+                # Mantém os frames atuais; tenta de novo no próximo ciclo
+                print(f"⚠️ Falha ao atualizar {', '.join(vencidas)}: {e}")
+
+    def iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._loop, name="servico-dados", daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+
+_servico = None
+_servico_lock = threading.Lock()
+
+def servico_dados():
+    global _servico
+    with _servico_lock:
+        if _servico is None:
+            _servico = ServicoDados()
+            _servico.iniciar()
+    return _servico
+
+def obter_dados(nomes):
+    return servico_dados().obter(nomes)
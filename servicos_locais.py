@@ -0,0 +1,119 @@
+# servicos_locais.py
+# Imitações locais do Nominatim e do ORS para testar a cotação (página
+# Cargas e cotação em lote) sem rede e sem gastar cota:
+#
+#   python servicos_locais.py --porta 8089
+#   NOMINATIM_URL=http://localhost:8089/search \
+#   ORS_URL=http://localhost:8089/v2/directions ORS_API_KEY=local \
+#   GEOCODE_INTERVALO_S=0 ORS_INTERVALO_S=0 CARGAS_CACHE_DIR=/tmp/cargas \
+#   streamlit run Hello.py
+#
+# O geocodificador devolve coordenadas fixas para cada endereço (derivadas
+# do texto, dentro do Sul/Sudeste); endereços com "inexistente" não são
+# encontrados. O roteador devolve uma reta entre os pontos, com um ponto a
+# cada ~200 m, no mesmo formato (polyline codificada) da API do ORS.
+import argparse
+import hashlib
+import json
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from geocodificacao import normalizar
+
+_LAT = (-30.0, -20.0)
+_LON = (-54.0, -44.0)
+_PASSO_KM = 0.2
+_VELOCIDADE_KMH = 60
+_FATOR_ESTRADA = 1.25
+
+
+def _coordenadas(endereco):
+    h = hashlib.sha1(normalizar(endereco).encode()).digest()
+    fr_lat = int.from_bytes(h[:4], "big") / 2 ** 32
+    fr_lon = int.from_bytes(h[4:8], "big") / 2 ** 32
+    return _LAT[0] + fr_lat * (_LAT[1] - _LAT[0]), _LON[0] + fr_lon * (_LON[1] - _LON[0])
+
+
+def _distancia_km(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(h))
+
+
+# Polyline codificada (precisão 5), o formato de "geometry" do ORS
+def _codificar(pontos):
+    saida = []
+    anterior = (0, 0)
+    for lat, lon in pontos:
+        atual = (round(lat * 1e5), round(lon * 1e5))
+        for valor in (atual[0] - anterior[0], atual[1] - anterior[1]):
+            valor = ~(valor << 1) if valor < 0 else valor << 1
+            while valor >= 0x20:
+                saida.append(chr((0x20 | (valor & 0x1F)) + 63))
+                valor >>= 5
+            saida.append(chr(valor + 63))
+        anterior = atual
+    return "".join(saida)
+
+
+def _rota(origem, destino):
+    reta_km = _distancia_km(origem, destino)
+    partes = max(int(reta_km / _PASSO_KM), 1)
+    pontos = [
+        (origem[0] + (destino[0] - origem[0]) * i / partes, origem[1] + (destino[1] - origem[1]) * i / partes)
+        for i in range(partes + 1)
+    ]
+    distancia_km = reta_km * _FATOR_ESTRADA
+    return {
+        "routes": [{
+            "summary": {"distance": distancia_km * 1000, "duration": distancia_km / _VELOCIDADE_KMH * 3600},
+            "geometry": _codificar(pontos),
+        }]
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _responder(self, dados, status=200):
+        corpo = json.dumps(dados).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/search":
+            return self._responder({"error": "not found"}, 404)
+        endereco = parse_qs(url.query).get("q", [""])[0]
+        if not endereco.strip() or "inexistente" in normalizar(endereco):
+            return self._responder([])
+        lat, lon = _coordenadas(endereco)
+        self._responder([{"lat": str(lat), "lon": str(lon), "display_name": endereco}])
+
+    def do_POST(self):
+        if not urlparse(self.path).path.startswith("/v2/directions/"):
+            return self._responder({"error": "not found"}, 404)
+        corpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        (lon1, lat1), (lon2, lat2) = corpo["coordinates"][:2]
+        self._responder(_rota((lat1, lon1), (lat2, lon2)))
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geocodificador e roteador locais para testes.")
+    parser.add_argument("--porta", type=int, default=8089)
+    args = parser.parse_args(argv)
+    servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), _Handler)
+    print(f"🧪 Serviços locais em http://127.0.0.1:{args.porta} (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# ============================= Fila de tarefas =============================
+# Executa trabalhos demorados (geração e envio de relatórios) fora do script
+# do Streamlit. Cada tarefa tem um id para a página consultar o status, é
+# repetida com espera exponencial em caso de erro e cada mudança de estado
+# é registrada em um log JSONL que sobrevive a reinícios do servidor.
+TAREFAS_DIR = os.environ.get(
+    "TAREFAS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tarefas")
+)
+TAREFAS_WORKERS = int(os.environ.get("TAREFAS_WORKERS", 4))
+# Tarefas finalizadas mantidas no log; passando disso (com folga) o log é
+# regravado só com o estado atual das mais recentes
+TAREFAS_MAX_FINALIZADAS = int(os.environ.get("TAREFAS_MAX_FINALIZADAS", 200))
+_LOG_TAREFAS = os.path.join(TAREFAS_DIR, "tarefas.jsonl")
+
+NA_FILA = "na fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluída"
+FALHOU = "falhou"
+INTERROMPIDA = "interrompida"
+
+
+class FilaTarefas:
+    def __init__(self, workers=TAREFAS_WORKERS, log=_LOG_TAREFAS):
+        self.log = log
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tarefa")
+        self._linhas_log = 0
+        self._tarefas = self._carregar_log()
+        with self._lock:
+            self._compactar()
+
+    # Estado final de cada tarefa do log; o que estava em andamento quando
+    # o processo anterior morreu fica como interrompida
+    def _carregar_log(self):
+        tarefas = {}
+        try:
+            with open(self.log, encoding="utf-8") as f:
+                for linha in f:
+                    self._linhas_log += 1
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue
+                    tarefas[registro["id"]] = registro
+        except OSError:
+            return {}
+        for tarefa in tarefas.values():
+            if tarefa["status"] in (NA_FILA, EXECUTANDO):
+                tarefa["status"] = INTERROMPIDA
+        return tarefas
+
+    def _registrar(self, id_tarefa, **campos):
+        with self._lock:
+            tarefa = self._tarefas[id_tarefa]
+            tarefa.update(campos, atualizado_em=datetime.now().isoformat(timespec="seconds"))
+            os.makedirs(os.path.dirname(self.log), exist_ok=True)
+            with open(self.log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(tarefa, ensure_ascii=False) + "\n")
+            self._linhas_log += 1
+            if self._linhas_log > 4 * (TAREFAS_MAX_FINALIZADAS + TAREFAS_WORKERS):
+                self._compactar()
+
+    # Descarta as finalizadas mais antigas além do limite e regrava o log com
+    # uma linha por tarefa. Chamado com self._lock
+    def _compactar(self):
+        finalizadas = sorted(
+            (t for t in self._tarefas.values() if t["status"] not in (NA_FILA, EXECUTANDO)),
+            key=lambda t: t["criado_em"],
+        )
+        for tarefa in finalizadas[:-TAREFAS_MAX_FINALIZADAS or None]:
+            del self._tarefas[tarefa["id"]]
+        if self._linhas_log <= len(self._tarefas):
+            return
+        os.makedirs(os.path.dirname(self.log), exist_ok=True)
+        temporario = self.log + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            for tarefa in self._tarefas.values():
+                f.write(json.dumps(tarefa, ensure_ascii=False) + "\n")
+        os.replace(temporario, self.log)
+        self._linhas_log = len(self._tarefas)
+
+    def enviar(self, descricao, func, *args, tentativas=3, espera=2, **kwargs):
+        id_tarefa = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._tarefas[id_tarefa] = {
+                "id": id_tarefa,
+                "descricao": descricao,
+                "criado_em": datetime.now().isoformat(timespec="seconds"),
+            }
+        self._registrar(id_tarefa, status=NA_FILA, tentativa=0, erro=None)
+        self._executor.submit(self._executar, id_tarefa, func, args, kwargs, tentativas, espera)
+        return id_tarefa
+
+    def _executar(self, id_tarefa, func, args, kwargs, tentativas, espera):
+        for tentativa in range(1, tentativas + 1):
+            self._registrar(id_tarefa, status=EXECUTANDO, tentativa=tentativa)
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                print(f"❌ Tarefa {id_tarefa} falhou (tentativa {tentativa}/{tentativas}): {e}")
+                if tentativa == tentativas:
+                    self._registrar(id_tarefa, status=FALHOU, erro=str(e), detalhe=traceback.format_exc())
+                    return
+                self._registrar(id_tarefa, status=NA_FILA, erro=str(e))
+                time.sleep(espera * 2 ** (tentativa - 1))
+            else:
+                self._registrar(id_tarefa, status=CONCLUIDA, erro=None)
+                return
+
+    def status(self, id_tarefa):
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+            return dict(tarefa) if tarefa else None
+
+    def listar(self, limite=20):
+        with self._lock:
+            tarefas = sorted(self._tarefas.values(), key=lambda t: t["criado_em"], reverse=True)
+            return [dict(t) for t in tarefas[:limite]]
+
+
+_fila = None
+_fila_lock = threading.Lock()
+
+def fila_tarefas():
+    global _fila
+    with _fila_lock:
+        if _fila is None:
+            _fila = FilaTarefas()
+    return _fila